@@ -1,12 +1,53 @@
-"""Module that facilitates the solving of OGR instances using AMPL."""
+"""Module that facilitates the solving of OGR instances using AMPL.
 
-from .generation import generate_golomb_ruler_improved, generate_golomb_ruler_naive
-from .models import solve
-from .ruler import GolombRuler
+The submodules are imported on first access to their names (PEP 562), so that `import ogr` stays
+cheap and works without AMPL nor the optional dependencies of the modules that aren't used.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .generation import (
+        generate_golomb_ruler_improved,
+        generate_golomb_ruler_naive,
+        generate_golomb_rulers_improved,
+    )
+    from .models import solve
+    from .ruler import GolombRuler
+    from .search import solve_exact
+
+# Public name -> submodule defining it
+_LAZY_NAMES = {
+    "solve": "models",
+    "solve_exact": "search",
+    "generate_golomb_ruler_improved": "generation",
+    "generate_golomb_rulers_improved": "generation",
+    "generate_golomb_ruler_naive": "generation",
+    "GolombRuler": "ruler",
+}
 
 __all__ = [
     "solve",
+    "solve_exact",
     "generate_golomb_ruler_improved",
+    "generate_golomb_rulers_improved",
     "generate_golomb_ruler_naive",
     "GolombRuler",
 ]
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(f".{_LAZY_NAMES[name]}", __name__), name)
+    # Later accesses don't go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -1,19 +1,43 @@
 """A colllection of the different formulations needed to solve OGR."""
 
+from ..bounds import lower_bound as span_lower_bound
 from ..solvers import AMPLSolver
 
 
 def ampl_choose_solver(solver: AMPLSolver) -> str:
     """Return the AMPL source code that sets the solver to `solver`."""
-    return f"""
+    return (
+        f"""
         option solver {solver.ampl_name()};
         solve;
+        """
+        + ampl_display_results()
+    )
+
+
+def ampl_display_results() -> str:
+    """Return the AMPL source code that displays the outcome of the last solve.
+
+    Along with the distances, the statistics read by `ogr.telemetry.parse_ampl_stats` are shown. The
+    best bound is displayed last since not every solver reports it.
+    """
+    return """
+        display solve_result;
+        display _solve_elapsed_time;
+        display _ampl_elapsed_time;
+        display _nvars;
+        display _ncons;
+        display total_length;
         display d;
+        display total_length.bestbound;
         """
 
 
-def ogr_integer_lp_model(order: int, upper_bound: int) -> str:
-    """Return the ampl source code defining the integere linear programming formulation of OGR."""
+def ogr_integer_lp_model(order: int, upper_bound: int, lower_bound: int = None) -> str:
+    """Return the ampl source code defining the integere linear programming formulation of OGR.
+
+    A `lower_bound` on the length of the ruler is added as a constraint when provided.
+    """
     return (
         f"""
         param upper_bound = {upper_bound};
@@ -38,9 +62,424 @@ def ogr_integer_lp_model(order: int, upper_bound: int) -> str:
         subject to distance_identity {(i, j) in pairs_consecutive}:
             sum {k in i..j - 1} d[k, k + 1] = d[i, j];
         """
+        + ogr_length_lower_bound(lower_bound)
+    )
+
+
+def ogr_length_lower_bound(lower_bound: int = None) -> str:
+    """Return the ampl source code constraining the length of the ruler to be at least `lower_bound`."""
+    if lower_bound is None:
+        return ""
+
+    return f"""
+        subject to length_lower_bound:
+            d[1, order] >= {lower_bound};
+        """
+
+
+def ogr_mirror_symmetry(order: int) -> str:
+    """Return the ampl source code excluding the mirror images, with d[1, 2] < d[order - 1, order].
+
+    Empty below 3 marks, where the first and last gaps are the same one.
+    """
+    if order < 3:
+        return ""
+
+    return """
+        subject to mirror_symmetry:
+            d[1, 2] + 1 <= d[order - 1, order];
+        """
+
+
+def ogr_integer_lp(
+    order: int,
+    upper_bound: int,
+    solver: AMPLSolver,
+    lower_bound: int = None,
+    warm_start: list[int] = None,
+) -> str:
+    """Return the complete ampl source code that loads an instance and solves
+
+    The marks of `warm_start`, a ruler with length <= `upper_bound`, are the initial values of the
+    solver.
+    """
+    return (
+        ogr_integer_lp_model(order, upper_bound, lower_bound)
+        + ogr_integer_lp_warm_start(warm_start)
+        + ampl_choose_solver(solver)
+    )
+
+
+def ogr_integer_lp_warm_start(marks: list[int] = None) -> str:
+    """Return the AMPL source code setting d and e to the values of the ruler `marks`."""
+    if marks is None:
+        return ""
+
+    marks = _oriented(marks)
+    lines = []
+    for i in range(len(marks)):
+        for j in range(i + 1, len(marks)):
+            v = marks[j] - marks[i]
+            lines.append(f"        let d[{i + 1}, {j + 1}] := {v};")
+            lines.append(f"        let e[{i + 1}, {j + 1}, {v}] := 1;")
+
+    return "\n" + "\n".join(lines) + "\n"
+
+
+def _oriented(marks: list[int]) -> list[int]:
+    """Return `marks` or its mirror image, whichever has its first gap smaller than its last."""
+    if len(marks) > 2 and marks[1] - marks[0] > marks[-1] - marks[-2]:
+        return [marks[-1] - m for m in reversed(marks)]
+    return list(marks)
+
+
+def ogr_integer_lp_size(order: int, upper_bound: int) -> tuple[int, int]:
+    """Return the number of variables and constraints of `ogr_integer_lp_model`."""
+    pairs = order * (order - 1) // 2
+    variables = pairs + pairs * upper_bound
+    constraints = 3 * pairs + upper_bound + pairs
+    return variables, constraints
+
+
+# ---------------------------------------------------------------------------- #
+#                     Reduced integer linear programming model                 #
+# ---------------------------------------------------------------------------- #
+
+
+def ogr_reduced_lp_domains(order: int, upper_bound: int) -> dict[tuple[int, int], range]:
+    """Return the values that each distance d[i, j] of a ruler with length <= `upper_bound` can take.
+
+    The marks i..j form a golomb ruler with j - i + 1 marks, so d[i, j] is at least the optimal
+    length G(j - i + 1). The marks 1..i and j..order fit in the rest of the ruler, so d[i, j] is at
+    most upper_bound - G(i) - G(order - j + 1).
+    """
+    spans = [0] + [span_lower_bound(k) for k in range(1, order + 1)]
+    return {
+        (i, j): range(spans[j - i + 1], upper_bound - spans[i] - spans[order - j + 1] + 1)
+        for i in range(1, order + 1)
+        for j in range(i + 1, order + 1)
+    }
+
+
+def ogr_reduced_lp_size(order: int, upper_bound: int) -> tuple[int, int]:
+    """Return the number of variables and constraints of `ogr_reduced_lp_model`."""
+    domains = ogr_reduced_lp_domains(order, upper_bound)
+    pairs = len(domains)
+    values = set()
+    for domain in domains.values():
+        values.update(domain)
+
+    variables = pairs + sum(len(domain) for domain in domains.values())
+    # assignment, definition and identity per pair, uniqueness per value, sum and symmetry
+    constraints = 3 * pairs + len(values) + 1 + (order >= 3)
+    return variables, constraints
+
+
+def ogr_reduced_lp_model(order: int, upper_bound: int, lower_bound: int = None) -> str:
+    """Return the ampl source code of the integer linear programming formulation with reduced domains.
+
+    Compared to `ogr_integer_lp_model`, e[i, j, v] only exists for the values in
+    `ogr_reduced_lp_domains`, mirror images are excluded with d[1, 2] < d[order - 1, order] and every
+    distance being distinct, their sum is at least 1 + 2 + ... + |pairs|.
+    """
+    domains = ogr_reduced_lp_domains(order, upper_bound)
+    bounds_data = "\n".join(
+        f"            {i} {j} {domain.start} {domain.stop - 1}"
+        for (i, j), domain in domains.items()
+    )
+
+    return (
+        f"""
+        param upper_bound = {upper_bound};
+        param order = {order};
+        """
+        + """
+        set N = {1..order};
+        set V = {1..upper_bound};
+        set pairs = {i in N, j in (i + 1)..order};
+        set pairs_consecutive = {i in 1..order - 1, j in (i + 1)..order};
+
+        param lo {pairs};
+        param hi {pairs};
+        set D {(i, j) in pairs} = lo[i, j]..hi[i, j];
+        """
+        + f"""
+        data;
+        param: lo hi :=
+{bounds_data}
+        ;
+        model;
+        """
+        + """
+        var d {(i, j) in pairs} >= lo[i, j], <= hi[i, j];
+        var e {(i, j) in pairs, v in D[i, j]} binary;
+
+        minimize total_length: d[1, order];
+        subject to distance_assignment {(i, j) in pairs}:
+            sum {v in D[i, j]} e[i, j, v] = 1;
+        subject to distance_uniqueness {v in V}:
+            sum {(i, j) in pairs: v in D[i, j]} e[i, j, v] <= 1;
+        subject to distance_definition {(i, j) in pairs}:
+            sum {v in D[i, j]} v * e[i, j, v] = d[i, j];
+        subject to distance_identity {(i, j) in pairs_consecutive}:
+            sum {k in i..j - 1} d[k, k + 1] = d[i, j];
+        subject to distinct_distances_sum:
+            sum {(i, j) in pairs} d[i, j] >= card(pairs) * (card(pairs) + 1) / 2;
+        """
+        + ogr_mirror_symmetry(order)
+        + ogr_length_lower_bound(lower_bound)
+    )
+
+
+def ogr_reduced_lp(
+    order: int,
+    upper_bound: int,
+    solver: AMPLSolver,
+    lower_bound: int = None,
+    warm_start: list[int] = None,
+) -> str:
+    """Return the complete ampl source code that loads an instance of the reduced model and solves"""
+    return (
+        ogr_reduced_lp_model(order, upper_bound, lower_bound)
+        + ogr_integer_lp_warm_start(warm_start)
+        + ampl_choose_solver(solver)
+    )
+
+
+# ---------------------------------------------------------------------------- #
+#                             Linear relaxation model                          #
+# ---------------------------------------------------------------------------- #
+
+
+def ogr_lp_relaxation_bound(
+    order: int, upper_bound: int, solver: AMPLSolver, lower_bound: int = None
+) -> str:
+    """Return the ampl source code that solves the linear relaxation of the reduced model.
+
+    The script displays `total_length`, whose ceiling is a lower bound on the length of a ruler with
+    `order` marks and length at most `upper_bound`. The relaxation has no integer variable, so it is
+    solved much faster than the integer model.
+    """
+    return (
+        ogr_reduced_lp_model(order, upper_bound, lower_bound)
+        + f"""
+        option relax_integrality 1;
+        option solver {solver.ampl_name()};
+        solve;
+        display solve_result;
+        display total_length;
+        """
+    )
+
+
+def ogr_relaxed_lp(
+    order: int,
+    upper_bound: int,
+    solver: AMPLSolver,
+    lower_bound: int = None,
+    warm_start: list[int] = None,
+) -> str:
+    """Return the ampl source code that bounds the length with the linear relaxation, then solves.
+
+    The ceiling of the relaxed length is added as a constraint to the reduced integer model before
+    solving it, so that the solver starts with a tighter lower bound.
+    """
+    return (
+        ogr_reduced_lp_model(order, upper_bound, lower_bound)
+        + f"""
+        option relax_integrality 1;
+        option solver {solver.ampl_name()};
+        solve;
+        """
+        + """
+        param relaxation_bound;
+        let relaxation_bound := ceil(total_length - 1e-6);
+        subject to relaxation_length_bound:
+            d[1, order] >= relaxation_bound;
+        option relax_integrality 0;
+        """
+        + ogr_integer_lp_warm_start(warm_start)
+        + """
+        solve;
+        """
+        + ampl_display_results()
+    )
+
+
+# ---------------------------------------------------------------------------- #
+#                             Constraint programming                           #
+# ---------------------------------------------------------------------------- #
+
+
+def ogr_mark_domains(order: int, upper_bound: int) -> list[range]:
+    """Return the positions that each mark of a ruler with length <= `upper_bound` can take."""
+    domains = ogr_reduced_lp_domains(order, upper_bound)
+    return [range(0, 1)] + [domains[1, j] for j in range(2, order + 1)]
+
+
+def ogr_mark_domains_data(order: int, upper_bound: int) -> str:
+    """Return the ampl data statement setting `lo[k]` and `hi[k]` to the domain of each mark."""
+    rows = "\n".join(
+        f"            {k} {domain.start} {domain.stop - 1}"
+        for k, domain in enumerate(ogr_mark_domains(order, upper_bound), 1)
+    )
+    return f"""
+        data;
+        param: lo hi :=
+{rows}
+        ;
+        model;
+        """
+
+
+def ogr_constraint_program_size(order: int, upper_bound: int) -> tuple[int, int]:
+    """Return the number of variables and constraints of `ogr_constraint_program_model`."""
+    # increasing marks, alldiff and symmetry
+    return order, (order - 1) + 1 + (order >= 3)
+
+
+def ogr_constraint_program_model(
+    order: int, upper_bound: int, lower_bound: int = None
+) -> str:
+    """Return the ampl source code of the constraint programming formulation of OGR.
+
+    The only variables are the positions x[k] of the marks and every distance d[i, j] = x[j] - x[i]
+    is required to be distinct by a single `alldiff` constraint.
+    """
+    return (
+        f"""
+        param upper_bound = {upper_bound};
+        param order = {order};
+        """
+        + """
+        set N = {1..order};
+        set pairs = {i in N, j in (i + 1)..order};
+
+        param lo {N};
+        param hi {N};
+        """
+        + ogr_mark_domains_data(order, upper_bound)
+        + """
+        var x {k in N} integer >= lo[k], <= hi[k];
+        var d {(i, j) in pairs} = x[j] - x[i];
+
+        minimize total_length: x[order];
+        subject to increasing_marks {k in 1..order - 1}:
+            x[k] + 1 <= x[k + 1];
+        subject to distinct_distances:
+            alldiff {(i, j) in pairs} d[i, j];
+        """
+        + ogr_mirror_symmetry(order)
+        + ogr_length_lower_bound(lower_bound)
+    )
+
+
+def ogr_constraint_program(
+    order: int,
+    upper_bound: int,
+    solver: AMPLSolver,
+    lower_bound: int = None,
+    warm_start: list[int] = None,
+) -> str:
+    """Return the complete ampl source code that loads an instance of the CP model and solves"""
+    return (
+        ogr_constraint_program_model(order, upper_bound, lower_bound)
+        + ogr_constraint_program_warm_start(warm_start)
+        + ampl_choose_solver(solver)
     )
 
 
-def ogr_integer_lp(order: int, upper_bound: int, solver: AMPLSolver) -> str:
-    """Return the complete ampl source code that loads an instance and solves"""
-    return ogr_integer_lp_model(order, upper_bound) + ampl_choose_solver(solver)
+def ogr_constraint_program_warm_start(marks: list[int] = None) -> str:
+    """Return the AMPL source code setting x to the marks of the ruler `marks`."""
+    if marks is None:
+        return ""
+
+    lines = [
+        f"        let x[{k}] := {mark};" for k, mark in enumerate(_oriented(marks), 1)
+    ]
+    return "\n" + "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------- #
+#                             Quadratic programming                            #
+# ---------------------------------------------------------------------------- #
+
+
+def ogr_quadratic_program_size(order: int, upper_bound: int) -> tuple[int, int]:
+    """Return the number of variables and constraints of `ogr_quadratic_program_model`."""
+    domains = ogr_mark_domains(order, upper_bound)
+    variables = sum(len(domain) for domain in domains)
+    # assignment per mark, increasing marks, occupancy per position, one quadratic per distance and
+    # symmetry
+    constraints = order + (order - 1) + (upper_bound + 1) + upper_bound + (order >= 3)
+    return variables, constraints
+
+
+def ogr_quadratic_program_model(
+    order: int, upper_bound: int, lower_bound: int = None
+) -> str:
+    """Return the ampl source code of the quadratic programming formulation of OGR.
+
+    y[k, v] places the mark k at the position v. With o[v] = 1 when a mark lies at v, the distance t
+    is measured at most once when the sum of o[v] * o[v + t] over v is at most 1. The model has
+    order * (upper_bound + 1) binaries at most, instead of |pairs| * upper_bound for the ILP.
+    """
+    return (
+        f"""
+        param upper_bound = {upper_bound};
+        param order = {order};
+        """
+        + """
+        set N = {1..order};
+        set P = {0..upper_bound};
+        set pairs = {i in N, j in (i + 1)..order};
+
+        param lo {N};
+        param hi {N};
+        """
+        + ogr_mark_domains_data(order, upper_bound)
+        + """
+        var y {k in N, v in lo[k]..hi[k]} binary;
+        var x {k in N} = sum {v in lo[k]..hi[k]} v * y[k, v];
+        var o {v in P} = sum {k in N: lo[k] <= v <= hi[k]} y[k, v];
+        var d {(i, j) in pairs} = x[j] - x[i];
+
+        minimize total_length: x[order];
+        subject to mark_assignment {k in N}:
+            sum {v in lo[k]..hi[k]} y[k, v] = 1;
+        subject to increasing_marks {k in 1..order - 1}:
+            x[k] + 1 <= x[k + 1];
+        subject to single_occupancy {v in P}:
+            o[v] <= 1;
+        subject to distance_uniqueness {t in 1..upper_bound}:
+            sum {v in 0..upper_bound - t} o[v] * o[v + t] <= 1;
+        """
+        + ogr_mirror_symmetry(order)
+        + ogr_length_lower_bound(lower_bound)
+    )
+
+
+def ogr_quadratic_program(
+    order: int,
+    upper_bound: int,
+    solver: AMPLSolver,
+    lower_bound: int = None,
+    warm_start: list[int] = None,
+) -> str:
+    """Return the complete ampl source code that loads an instance of the QP model and solves"""
+    return (
+        ogr_quadratic_program_model(order, upper_bound, lower_bound)
+        + ogr_quadratic_program_warm_start(warm_start)
+        + ampl_choose_solver(solver)
+    )
+
+
+def ogr_quadratic_program_warm_start(marks: list[int] = None) -> str:
+    """Return the AMPL source code placing each mark of the ruler `marks` with y."""
+    if marks is None:
+        return ""
+
+    lines = [
+        f"        let y[{k}, {mark}] := 1;" for k, mark in enumerate(_oriented(marks), 1)
+    ]
+    return "\n" + "\n".join(lines) + "\n"
@@ -24,3 +24,8 @@ subject to distance_definition {(i, j) in pairs}:
 
 subject to distance_identity {(i, j) in pairs_consecutive}:
     sum {k in i..j - 1} d[k, k + 1] = d[i, j];
+
+param lower_bound default 1;
+
+subject to length_lower_bound:
+    d[1, order] >= lower_bound;
@@ -0,0 +1,123 @@
+"""Long-lived AMPL interpreter driven through `amplpy`.
+
+Spawning a fresh `ampl` process and parsing the model for every solve dominates the wall time of
+small instances. An `AMPLSession` reads `ogr.mod` once and only updates its parameters between
+solves, reading the distances back as structured values instead of scraping stdout.
+"""
+
+from __future__ import annotations
+
+from os.path import dirname, join
+
+from . import ogr_integer_lp_warm_start
+from ..exceptions import AMPLNotFound, NotGolombRuler, SolveError
+from ..ruler import GolombRuler
+from ..solvers import AMPLSolver
+from ..telemetry import parse_ampl_stats
+
+MODEL_FILE = join(dirname(__file__), "ogr.mod")
+
+# Clears the initial values of the assignment variables of `ogr.mod`
+_RESET_E = "let {(i, j) in pairs, v in V} e[i, j, v] := 0;"
+
+
+class AMPLSession:
+    """An AMPL interpreter with the integer linear programming model of `ogr.mod` loaded."""
+
+    def __init__(self):
+        """Start the interpreter and read the model.
+
+        Raises `AMPLNotFound` if `amplpy` or the ampl executable is missing.
+        """
+        try:
+            from amplpy import AMPL
+        except ImportError as e:
+            raise AMPLNotFound("The amplpy package is required for AMPL sessions") from e
+
+        try:
+            self._ampl = AMPL()
+        except Exception as e:
+            raise AMPLNotFound(str(e)) from e
+
+        self._ampl.read(MODEL_FILE)
+        self.last_solve_result = None
+        # Statistics of the last solve, with the keys of `telemetry.parse_ampl_stats`
+        self.last_stats = {}
+
+    def solve(
+        self,
+        order: int,
+        upper_bound: int,
+        lower_bound: int = 1,
+        solver: AMPLSolver = AMPLSolver.CPLEX,
+        timeout_s: float = None,
+        warm_start: list[int] = None,
+    ) -> GolombRuler:
+        """Solve the instance with `order` marks, only updating the parameters of the loaded model.
+
+        The solver starts from the ruler `warm_start` and only looks for strictly shorter rulers.
+        Return `GolombRuler([0])` when the solver doesn't find a solution, like `models.solve`.
+        """
+        ampl = self._ampl
+        ampl.param["order"] = order
+        ampl.param["upper_bound"] = upper_bound
+        ampl.param["lower_bound"] = lower_bound
+        ampl.option["solver"] = solver.ampl_name()
+        options = solver.bound_option() or ""
+        if timeout_s is not None:
+            options += f" timelimit={timeout_s}"
+        if warm_start is not None:
+            if solver.cutoff_option() is not None:
+                options += f" {solver.cutoff_option()}={warm_start[-1] - 1}"
+            # The variables keep their values of the previous solve, the ruler only sets some of e
+            ampl.eval(_RESET_E)
+            ampl.eval(ogr_integer_lp_warm_start(warm_start))
+        ampl.option[f"{solver.ampl_name()}_options"] = options.strip()
+
+        ampl.solve()
+        self.last_solve_result = ampl.get_value("solve_result")
+        self.last_stats = self._stats()
+        if self.last_solve_result not in ("solved", "limit"):
+            return GolombRuler([0])
+
+        # d[1, j] is the position of the mark j
+        distances = ampl.get_variable("d").get_values().to_dict()
+        try:
+            return GolombRuler.from_distances(
+                [round(distances[1, j]) for j in range(2, order + 1)], order
+            )
+        except NotGolombRuler:
+            raise SolveError(
+                f"Error when processing problem with order {order} and upper_bound: {upper_bound}. Values of d: {distances}"
+            )
+
+    def _stats(self) -> dict:
+        """Read the statistics of the last solve, like `telemetry.parse_ampl_stats` does from stdout."""
+        ampl = self._ampl
+        stats = parse_ampl_stats(str(ampl.get_value("solve_message")))
+        stats["solver_time_s"] = ampl.get_value("_solve_elapsed_time")
+        stats["variables"] = int(ampl.get_value("_nvars"))
+        stats["constraints"] = int(ampl.get_value("_ncons"))
+        stats["objective"] = ampl.get_objective("total_length").value()
+        try:
+            stats["best_bound"] = ampl.get_value("total_length.bestbound")
+        except Exception:
+            # Not every solver reports a bound
+            pass
+        return stats
+
+    def close(self):
+        """Stop the interpreter."""
+        self._ampl.close()
+
+
+# One session per process, started on the first solve.
+_SESSION: AMPLSession = None
+
+
+def get_session() -> AMPLSession:
+    """Return the AMPL session of the current process, starting it if needed."""
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = AMPLSession()
+    return _SESSION
@@ -0,0 +1,98 @@
+"""Vectorized operations on many rulers at once.
+
+A batch of `k` rulers with `n` marks each is stored as a `(k, n)` integer array, one ruler per row.
+Every function here works on whole arrays with NumPy so that validating millions of candidate
+rulers costs a handful of array operations instead of one Python call per ruler.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+# Rows processed at once, bounds the size of the (rows, n * (n - 1) / 2) temporary arrays.
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def triu_distances_batch(marks: np.ndarray) -> np.ndarray:
+    """Compute the distances between every pair of marks of each ruler in `marks`.
+
+    Row `i` of the result matches `GolombRuler(marks[i]).triu_distances()`, a `(k, n * (n - 1) / 2)`
+    array.
+    """
+    marks = np.asarray(marks)
+    if marks.ndim != 2:
+        raise ValueError(f"Expected a (k, n) array of marks, got shape {marks.shape}")
+
+    lhs, rhs = np.triu_indices(marks.shape[1], k=1)
+    return np.abs(marks[:, rhs] - marks[:, lhs])
+
+
+def is_golomb_batch(
+    marks: np.ndarray, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> np.ndarray:
+    """Verify which rows of the `(k, n)` array `marks` are golomb rulers.
+
+    Returns a boolean array of length `k` agreeing with `utils.is_golomb_ruler` on every row.
+    """
+    marks = np.asarray(marks)
+    if marks.ndim != 2:
+        raise ValueError(f"Expected a (k, n) array of marks, got shape {marks.shape}")
+
+    k, n = marks.shape
+    result = np.all(marks >= 0, axis=1)
+    if n < 2:
+        return result
+
+    for start in range(0, k, chunk_size):
+        stop = min(start + chunk_size, k)
+
+        # Sorting the distances puts repeated values next to each other.
+        distances = np.sort(triu_distances_batch(marks[start:stop]), axis=1)
+        distinct = np.all(np.diff(distances, axis=1) != 0, axis=1)
+
+        # A distance of 0 means that a mark is repeated.
+        result[start:stop] &= distinct & (distances[:, 0] > 0)
+
+    return result
+
+
+def is_golomb_ragged(
+    sequences: Sequence[Sequence[int]], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> np.ndarray:
+    """Verify which of `sequences` are golomb rulers when they don't all have the same order.
+
+    Sequences are grouped by order and each group is checked with `is_golomb_batch`.
+    """
+    orders = np.fromiter((len(s) for s in sequences), dtype=np.int64, count=len(sequences))
+    result = np.empty(len(sequences), dtype=bool)
+
+    for order in np.unique(orders):
+        (rows,) = np.nonzero(orders == order)
+        marks = np.array([sequences[i] for i in rows], dtype=np.int64).reshape(
+            len(rows), order
+        )
+        result[rows] = is_golomb_batch(marks, chunk_size)
+
+    return result
+
+
+def is_golomb_indicator_batch(
+    indicators: np.ndarray, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> np.ndarray:
+    """Verify which rows of the boolean `(k, length + 1)` array `indicators` are golomb rulers.
+
+    Column `m` of a row is true when the ruler has a mark at `m`, so rows can have different orders.
+    """
+    indicators = np.asarray(indicators, dtype=bool)
+    orders = indicators.sum(axis=1)
+    result = np.empty(len(indicators), dtype=bool)
+
+    for order in np.unique(orders):
+        (rows,) = np.nonzero(orders == order)
+        # np.nonzero walks the rows in order, so the columns of each row come out sorted.
+        marks = np.nonzero(indicators[rows])[1].reshape(len(rows), order)
+        result[rows] = is_golomb_batch(marks, chunk_size)
+
+    return result
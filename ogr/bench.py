@@ -0,0 +1,257 @@
+"""Reproducible benchmarks of the generators, validators and solvers.
+
+Each benchmark builds, for a given order, a function whose execution is timed a few times. The best
+time of each (benchmark, order) is collected in a polars DataFrame, which can be appended to a
+Parquet history and compared against a stored baseline to flag regressions.
+"""
+
+from __future__ import annotations
+
+import platform
+import subprocess
+import sys
+import time
+from collections.abc import Callable, Iterable
+from os.path import dirname, exists, join
+
+import polars
+
+from . import models, search
+from .bounds import KNOWN_OPTIMAL_LENGTHS
+from .enumerate import count_rulers
+from .exceptions import AMPLNotFound
+from .generation import generate_golomb_ruler_improved, generate_golomb_ruler_naive
+from .ruler import GolombRuler
+from .utils import data_dir, is_golomb_ruler
+
+# A run slower than its baseline by more than this fraction is a regression
+DEFAULT_TOLERANCE = 0.25
+
+# Benchmarks are repeated until they ran at least this long, to time fast functions accurately
+_MIN_RUN_TIME_S = 0.05
+
+
+def history_path() -> str:
+    """Return the default location of the benchmark history."""
+    return join(data_dir(), "bench_history.parquet")
+
+
+def baseline_path() -> str:
+    """Return the default location of the benchmark baseline."""
+    return join(data_dir(), "bench_baseline.parquet")
+
+
+# ---------------------------------------------------------------------------- #
+#                                  Benchmarks                                  #
+# ---------------------------------------------------------------------------- #
+
+
+def _bench_naive(order: int) -> Callable[[], object]:
+    return lambda: generate_golomb_ruler_naive(order)
+
+
+def _bench_improved(order: int) -> Callable[[], object]:
+    return lambda: generate_golomb_ruler_improved(order)
+
+
+def _bench_is_golomb_ruler(order: int) -> Callable[[], object]:
+    marks = generate_golomb_ruler_improved(order)
+    return lambda: is_golomb_ruler(marks)
+
+
+def _bench_triu_distances(order: int) -> Callable[[], object]:
+    marks = generate_golomb_ruler_improved(order)
+    # A new ruler each time, `triu_distances` is cached on the instance
+    return lambda: GolombRuler(marks).triu_distances()
+
+
+def _bench_enumeration(order: int) -> Callable[[], object]:
+    length = KNOWN_OPTIMAL_LENGTHS[order - 1]
+    return lambda: count_rulers(length, order)
+
+
+def _bench_formulation(
+    formulation: models.Formulations,
+) -> Callable[[int], Callable[[], object]]:
+    def bench(order: int) -> Callable[[], object]:
+        def run():
+            # The branch and bound search memoizes the optimal rulers it found
+            search.clear_cache()
+            return models.solve(order, formulation=formulation, use_cache=False)
+
+        return run
+
+    return bench
+
+
+def _bench_import(module: str) -> Callable[[int], Callable[[], object]]:
+    def bench(order: int) -> Callable[[], object]:
+        # A fresh interpreter each time, like the short-lived workers and CLI calls
+        arguments = [sys.executable, "-c", f"import {module}"]
+        return lambda: subprocess.run(arguments, check=True, capture_output=True)
+
+    return bench
+
+
+# Modules whose startup time is benchmarked, interpreter start included
+STARTUP_MODULES = ["ogr", "ogr.generation", "ogr.models", "ogr_main"]
+
+# Benchmark name -> function building the timed function for an order
+BENCHMARKS: dict[str, Callable[[int], Callable[[], object]]] = {
+    "generate_naive": _bench_naive,
+    "generate_improved": _bench_improved,
+    "is_golomb_ruler": _bench_is_golomb_ruler,
+    "triu_distances": _bench_triu_distances,
+    "enumeration": _bench_enumeration,
+} | {
+    f"solve_{formulation.name}": _bench_formulation(formulation)
+    for formulation in models.Formulations
+} | {f"import_{module}": _bench_import(module) for module in STARTUP_MODULES}
+
+# Benchmarks that don't depend on the order, only run for the first one
+ORDER_INDEPENDENT = {f"import_{module}" for module in STARTUP_MODULES}
+
+# Benchmarks whose cost explodes with the order are only run up to this order
+MAX_ORDERS = {"enumeration": 8, "generate_naive": 12} | {
+    f"solve_{formulation.name}": 9 for formulation in models.Formulations
+}
+
+
+def time_function(function: Callable[[], object], repeat: int = 5) -> tuple[float, float]:
+    """Return the best and mean time of a single call to `function` over `repeat` runs."""
+    # Calibrate the number of calls per run on the first call
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    number = max(1, int(_MIN_RUN_TIME_S / elapsed)) if elapsed > 0 else 1000
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start) / number)
+
+    return min(times), sum(times) / len(times)
+
+
+def run_benchmarks(
+    orders: Iterable[int],
+    names: Iterable[str] = None,
+    repeat: int = 5,
+    verbose=False,
+) -> polars.DataFrame:
+    """Time the benchmarks `names`, all of them by default, for every order of `orders`.
+
+    Return one row per (benchmark, order) with the columns `benchmark`, `order`, `best_s`, `mean_s`,
+    `repeat`, `status`, `timestamp`, `commit` and `python`. Solvers that aren't installed are
+    reported with the status "skipped" and the benchmarks that raise with "error: <exception>".
+    """
+    names = list(BENCHMARKS) if names is None else list(names)
+    for name in names:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark {name!r}, must be in {list(BENCHMARKS)}")
+
+    orders = [order for order in orders if order >= 2]
+    timestamp = time.time()
+    commit = _git_commit()
+    rows = []
+    for name in names:
+        for order in orders:
+            if order > MAX_ORDERS.get(name, order):
+                continue
+            if name in ORDER_INDEPENDENT and order != orders[0]:
+                continue
+
+            row = dict(
+                benchmark=name,
+                order=order,
+                best_s=None,
+                mean_s=None,
+                repeat=repeat,
+                status="ok",
+                timestamp=timestamp,
+                commit=commit,
+                python=platform.python_version(),
+            )
+            try:
+                row["best_s"], row["mean_s"] = time_function(
+                    BENCHMARKS[name](order), repeat
+                )
+            except AMPLNotFound:
+                row["status"] = "skipped"
+            except Exception as e:
+                row["status"] = f"error: {e!r}"
+
+            if verbose:
+                best = "-" if row["best_s"] is None else f"{row['best_s'] * 1e3:.3f}ms"
+                print(f"=> {name:40} order {order:3}: {best} {row['status']}")
+            rows.append(row)
+
+    schema = dict(
+        benchmark=polars.Utf8,
+        order=polars.Int64,
+        best_s=polars.Float64,
+        mean_s=polars.Float64,
+        repeat=polars.Int64,
+        status=polars.Utf8,
+        timestamp=polars.Float64,
+        commit=polars.Utf8,
+        python=polars.Utf8,
+    )
+    return polars.DataFrame(rows, schema=schema)
+
+
+def _git_commit() -> str | None:
+    """Return the commit of the checkout this package runs from, if any."""
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            cwd=dirname(__file__),
+            timeout=5,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return output.stdout.decode().strip() or None
+
+
+# ---------------------------------------------------------------------------- #
+#                             History and baselines                            #
+# ---------------------------------------------------------------------------- #
+
+
+def append_history(results: polars.DataFrame, path: str = None) -> polars.DataFrame:
+    """Append `results` to the Parquet history at `path` and return the whole history."""
+    path = path or history_path()
+    if exists(path):
+        results = polars.concat([polars.read_parquet(path), results])
+    results.write_parquet(path)
+    return results
+
+
+def save_baseline(results: polars.DataFrame, path: str = None):
+    """Store `results` as the baseline that later runs are compared to."""
+    results.write_parquet(path or baseline_path())
+
+
+def compare(
+    results: polars.DataFrame,
+    baseline: polars.DataFrame,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> polars.DataFrame:
+    """Join `results` with `baseline` on (benchmark, order).
+
+    Add the columns `baseline_s`, `ratio` of the best times and `regression`, true when a benchmark
+    is slower than its baseline by more than `tolerance`.
+    """
+    baseline = baseline.select(
+        "benchmark", "order", polars.col("best_s").alias("baseline_s")
+    )
+    return (
+        results.join(baseline, on=["benchmark", "order"], how="left", coalesce=True)
+        .with_columns(ratio=polars.col("best_s") / polars.col("baseline_s"))
+        .with_columns(
+            regression=(polars.col("ratio") > 1 + tolerance).fill_null(False)
+        )
+    )
@@ -0,0 +1,112 @@
+"""Cheap bounds on the length of an optimal golomb ruler.
+
+`upper_bound` returns the length of the shortest ruler that a set of providers can build quickly,
+so it is always the length of a valid ruler. `lower_bound` returns a length that no golomb ruler of
+the requested order can beat. Both are used to shrink the size of the AMPL models.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import lru_cache
+
+from .constructions import best_construction
+from .generation import generate_golomb_ruler_improved
+
+# Lengths of the optimal golomb rulers with 1 to 28 marks, all proven optimal.
+KNOWN_OPTIMAL_LENGTHS = [
+    0, 1, 3, 6, 11, 17, 25, 34, 44, 55,
+    72, 85, 106, 127, 151, 177, 199, 216, 246, 283,
+    333, 356, 372, 425, 480, 492, 553, 585,
+]  # fmt: skip
+
+# Past this order the greedy generator is much slower than the algebraic constructions.
+_GREEDY_MAX_ORDER = 200
+
+
+def known_optimal_length(order: int) -> int | None:
+    """Return the proven optimal length of a ruler with `order` marks, if known."""
+    if 1 <= order <= len(KNOWN_OPTIMAL_LENGTHS):
+        return KNOWN_OPTIMAL_LENGTHS[order - 1]
+    return None
+
+
+def greedy_length(order: int) -> int | None:
+    """Return the length of the ruler built by `generate_golomb_ruler_improved`."""
+    if order > _GREEDY_MAX_ORDER:
+        return None
+    return generate_golomb_ruler_improved(order)[-1]
+
+
+@lru_cache(maxsize=None)
+def construction_length(order: int) -> int | None:
+    """Return the length of the shortest ruler built by `constructions.best_construction`."""
+    return best_construction(order)[0][-1]
+
+
+# Each provider returns the length of a valid ruler with the requested order, or None if it can't
+# build one cheaply.
+UPPER_BOUND_PROVIDERS: list[Callable[[int], int | None]] = [
+    known_optimal_length,
+    greedy_length,
+    construction_length,
+]
+
+
+@lru_cache(maxsize=None)
+def heuristic_ruler(order: int) -> tuple[int, ...]:
+    """Return the marks of the shortest ruler with `order` marks built by the greedy generator or
+    the algebraic constructions, to warm start exact solvers.
+    """
+    if order < 1:
+        raise ValueError("order must be greater than 0")
+    if order <= 3:
+        return (0, 1, 3)[:order]
+
+    construction, _ = best_construction(order)
+    if order > _GREEDY_MAX_ORDER:
+        return tuple(construction)
+    greedy = generate_golomb_ruler_improved(order)
+    return tuple(min(greedy, construction, key=lambda marks: marks[-1]))
+
+
+def upper_bound(order: int) -> int:
+    """Return the tightest length among the rulers with `order` marks built by the providers."""
+    if order < 1:
+        raise ValueError("order must be greater than 0")
+    if order <= 2:
+        return order - 1
+
+    lengths = [provider(order) for provider in UPPER_BOUND_PROVIDERS]
+    return min(length for length in lengths if length is not None)
+
+
+def lower_bound(order: int) -> int:
+    """Return a length that is at most the optimal length of a ruler with `order` marks.
+
+    Past the table of known lengths, we use the largest of the trivial bound n (n - 1) / 2 and
+    Lindström's bound on Sidon sets: n marks in {0, ..., L} require n < sqrt(L + 1) + (L + 1)^(1/4) + 1.
+    """
+    if order < 1:
+        raise ValueError("order must be greater than 0")
+
+    known = known_optimal_length(order)
+    if known is not None:
+        return known
+
+    trivial = order * (order - 1) // 2
+
+    # Smallest N = L + 1 allowed by Lindström's bound, with some slack for rounding.
+    n = 1
+    while n**0.5 + n**0.25 + 1 < order - 1e-9:
+        n *= 2
+    lo, hi = n // 2, n
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if mid**0.5 + mid**0.25 + 1 < order - 1e-9:
+            lo = mid + 1
+        else:
+            hi = mid
+
+    return max(trivial, lo - 1)
+
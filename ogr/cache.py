@@ -0,0 +1,150 @@
+"""Persistent cache of solved OGR instances.
+
+Results are stored in a SQLite database inside the user data directory and keyed by the problem
+instance: (order, upper_bound, formulation, solver). Every entry also records a hash of the AMPL
+source code that produced it, so that changing a formulation invalidates its cached rulers.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+from os.path import join
+
+from .ruler import GolombRuler
+from .utils import data_dir
+
+# Entries that haven't been used for this long are evicted.
+DEFAULT_MAX_AGE_S = 30 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    ord INTEGER NOT NULL,
+    upper_bound INTEGER NOT NULL,
+    formulation TEXT NOT NULL,
+    solver TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    marks TEXT NOT NULL,
+    time_s REAL NOT NULL,
+    status TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (ord, upper_bound, formulation, solver)
+)
+"""
+
+
+def source_hash(source_code: str) -> str:
+    """Return the hash used to detect that the AMPL source code of an instance changed."""
+    return hashlib.sha256(source_code.encode()).hexdigest()
+
+
+class ResultCache:
+    """On-disk cache of the rulers returned by `models.solve`."""
+
+    def __init__(
+        self,
+        path: str = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_age_s: float = DEFAULT_MAX_AGE_S,
+    ):
+        """Open (or create) the cache stored at `path`, by default `cache.sqlite` in the user data dir."""
+        self.path = path if path is not None else join(data_dir(), "cache.sqlite")
+        self.max_entries = max_entries
+        self.max_age_s = max_age_s
+
+        # Concurrent sweeps share the database, wait for locks instead of failing.
+        self._connection = sqlite3.connect(self.path, timeout=30)
+        with self._connection:
+            self._connection.execute(_SCHEMA)
+
+    def get(
+        self,
+        order: int,
+        upper_bound: int,
+        formulation: str,
+        solver: str,
+        source_code: str,
+    ) -> GolombRuler | None:
+        """Return the cached ruler of an instance, or `None` if it's missing or out of date."""
+        key = (order, upper_bound, formulation, solver)
+        row = self._connection.execute(
+            "SELECT source_hash, marks FROM results "
+            "WHERE ord = ? AND upper_bound = ? AND formulation = ? AND solver = ?",
+            key,
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        with self._connection:
+            if row[0] != source_hash(source_code):
+                self._connection.execute(
+                    "DELETE FROM results "
+                    "WHERE ord = ? AND upper_bound = ? AND formulation = ? AND solver = ?",
+                    key,
+                )
+                return None
+
+            self._connection.execute(
+                "UPDATE results SET accessed = ? "
+                "WHERE ord = ? AND upper_bound = ? AND formulation = ? AND solver = ?",
+                (time.time(), *key),
+            )
+
+        return GolombRuler([int(m) for m in row[1].split()])
+
+    def put(
+        self,
+        order: int,
+        upper_bound: int,
+        formulation: str,
+        solver: str,
+        source_code: str,
+        ruler: GolombRuler,
+        time_s: float,
+        status: str,
+    ):
+        """Store the ruler found for an instance, then evict stale entries."""
+        now = time.time()
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    order,
+                    upper_bound,
+                    formulation,
+                    solver,
+                    source_hash(source_code),
+                    " ".join(str(m) for m in ruler.sequence),
+                    time_s,
+                    status,
+                    now,
+                    now,
+                ),
+            )
+
+        self.evict()
+
+    def evict(self):
+        """Drop the entries older than `max_age_s`, then the least recently used above `max_entries`."""
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM results WHERE accessed < ?",
+                (time.time() - self.max_age_s,),
+            )
+            self._connection.execute(
+                "DELETE FROM results WHERE rowid NOT IN "
+                "(SELECT rowid FROM results ORDER BY accessed DESC, rowid DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        """Remove every entry of the cache."""
+        with self._connection:
+            self._connection.execute("DELETE FROM results")
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
@@ -0,0 +1,55 @@
+"""Checkpoints that let long-running solves, searches and enumerations resume after being killed.
+
+A checkpoint is a small JSON document in the `checkpoints` folder of the user data dir. It is
+replaced atomically, so a process killed while writing leaves the previous checkpoint intact.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from os.path import exists, join
+
+from .utils import data_dir
+
+
+def checkpoint_path(name: str) -> str:
+    """Return the location of the checkpoint called `name`."""
+    directory = join(data_dir(), "checkpoints")
+    os.makedirs(directory, exist_ok=True)
+    return join(directory, f"{name}.json")
+
+
+def read_checkpoint(path: str) -> dict | None:
+    """Return the state stored at `path`, or None if there is none or it is unreadable."""
+    if not exists(path):
+        return None
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_checkpoint(path: str, state: dict):
+    """Atomically replace the checkpoint at `path` with `state`.
+
+    The state is written to a unique temporary file next to `path`, so that concurrent writers never
+    share one.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            json.dump(state, file)
+        os.replace(tmp, path)
+    except BaseException:
+        if exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def remove_checkpoint(path: str):
+    """Delete the checkpoint at `path`, if any."""
+    if exists(path):
+        os.remove(path)
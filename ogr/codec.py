@@ -0,0 +1,124 @@
+"""Bijection between the rulers starting at 0 and the non-negative integers, their ids.
+
+Bit k of the id of a ruler is set when the ruler has a mark at k + 1, the mark at 0 being
+implicit. The rulers with length L are exactly the ids of [2^(L - 1), 2^L - 1] and the id of a
+ruler is smaller than the ids of the longer ones, like the ids of `ogr_rust.Ruler`.
+
+A batch of `k` rulers is stored as a `(k, n)` array of marks, one ruler per row as in
+`ogr.batch`, where the rows of the rulers with fewer than `n` marks are padded with `PADDING`.
+Ids are converted in bulk as long as they fit in 63 bits, that is for lengths up to 63.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+# Fills the end of the rows of rulers with fewer marks than the widest one of a batch
+PADDING = -1
+
+# Largest length whose ids are converted in bulk, they must fit in an int64
+MAX_BULK_LENGTH = 63
+
+
+def from_id(id: int) -> list[int]:
+    """Return the marks of the ruler with id `id`."""
+    if id < 0:
+        raise ValueError("Ruler ids are non-negative")
+    return [0] + [k + 1 for k in range(id.bit_length()) if id >> k & 1]
+
+
+def to_id(marks: list[int]) -> int:
+    """Return the id of the ruler `marks`, whose first mark must be 0."""
+    if len(marks) == 0 or min(marks) != 0:
+        raise ValueError(f"The first mark of {list(marks)} isn't 0")
+    id = 0
+    for mark in marks:
+        if mark > 0:
+            id |= 1 << (mark - 1)
+    return id
+
+
+def id_range(length: int) -> tuple[int, int]:
+    """Return the first and last ids of the rulers with length `length`."""
+    if length == 0:
+        return (0, 0)
+    return (1 << (length - 1), (1 << length) - 1)
+
+
+def length_of_id(id: int) -> int:
+    """Return the length of the ruler with id `id`."""
+    return id.bit_length()
+
+
+def indicators_from_ids(ids: np.ndarray, length: int = None) -> np.ndarray:
+    """Return the `(k, length + 1)` boolean array whose row i has a 1 at each mark of ruler `ids[i]`.
+
+    `length` defaults to the length of the longest ruler. This is the input of
+    `batch.is_golomb_indicator_batch`.
+    """
+    ids = _as_ids(ids)
+    if length is None:
+        length = int(ids.max()).bit_length() if len(ids) > 0 else 0
+
+    if length > MAX_BULK_LENGTH:
+        raise ValueError(f"Ids of rulers longer than {MAX_BULK_LENGTH} don't fit in an int64")
+
+    # Column k of the bits of the little endian bytes of an id is its bit k
+    bits = np.unpackbits(
+        ids.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little"
+    )
+    indicators = np.empty((len(ids), length + 1), dtype=bool)
+    indicators[:, 0] = True
+    indicators[:, 1:] = bits[:, :length]
+    return indicators
+
+
+def marks_from_ids(ids: np.ndarray) -> np.ndarray:
+    """Return the `(k, n)` array of the marks of the rulers `ids`, n being the largest order.
+
+    The rows of the rulers with fewer than n marks end with `PADDING`.
+    """
+    indicators = indicators_from_ids(ids)
+    k = len(indicators)
+    order = indicators.sum(axis=1)
+    n = int(order.max()) if k > 0 else 1
+
+    # Sorting moves the positions of the marks in front of the gaps, set to `width`
+    width = indicators.shape[1]
+    positions = np.where(indicators, np.arange(width), width)
+    marks = np.sort(positions, axis=1)[:, :n]
+    marks[marks == width] = PADDING
+    return marks
+
+
+def ids_from_marks(marks: np.ndarray) -> np.ndarray:
+    """Return the ids of the rulers of the `(k, n)` array `marks`, the inverse of `marks_from_ids`."""
+    marks = np.asarray(marks, dtype=np.int64)
+    if marks.ndim != 2:
+        raise ValueError(f"Expected a (k, n) array of marks, got shape {marks.shape}")
+    if marks.size > 0 and marks.max() > MAX_BULK_LENGTH:
+        raise ValueError(f"Ids of rulers longer than {MAX_BULK_LENGTH} don't fit in an int64")
+
+    bits = np.where(marks > 0, np.left_shift(1, np.maximum(marks - 1, 0)), 0)
+    return np.bitwise_or.reduce(bits, axis=1)
+
+
+def marks_from_id_range(start: int, stop: int) -> np.ndarray:
+    """Return the marks of the rulers with ids `start` to `stop` excluded, like `marks_from_ids`."""
+    return marks_from_ids(np.arange(start, stop, dtype=np.int64))
+
+
+def rows(marks: np.ndarray) -> list[list[int]]:
+    """Return the rulers of the `(k, n)` array `marks` as lists, without their padding."""
+    return [row[row != PADDING].tolist() for row in np.asarray(marks)]
+
+
+def _as_ids(ids: np.ndarray) -> np.ndarray:
+    ids = np.asarray(ids)
+    if ids.ndim != 1:
+        raise ValueError(f"Expected a 1-D array of ids, got shape {ids.shape}")
+    if ids.size > 0 and (int(ids.min()) < 0 or int(ids.max()).bit_length() > MAX_BULK_LENGTH):
+        raise ValueError(
+            f"Ids must be non-negative and below 2^{MAX_BULK_LENGTH} to be converted in bulk"
+        )
+    return ids.astype(np.int64)
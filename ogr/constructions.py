@@ -0,0 +1,329 @@
+"""Algebraic constructions of golomb rulers.
+
+Most constructions produce a modular golomb ruler: a set of residues modulo `m` whose differences
+are distinct modulo `m`. Any `n` consecutive marks of such a set, taken cyclically and shifted to
+start at 0, form a golomb ruler with `n` marks.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from itertools import product
+
+import numpy as np
+
+# ---------------------------------------------------------------------------- #
+#                                 Number theory                                #
+# ---------------------------------------------------------------------------- #
+
+
+def is_prime(n: int) -> bool:
+    """Check if `n` is prime by trial division."""
+    if n < 2:
+        return False
+    if n % 2 == 0:
+        return n == 2
+
+    d = 3
+    while d * d <= n:
+        if n % d == 0:
+            return False
+        d += 2
+
+    return True
+
+
+def next_prime(n: int) -> int:
+    """Return the smallest prime greater than or equal to `n`."""
+    while not is_prime(n):
+        n += 1
+    return n
+
+
+def prime_factors(n: int) -> list[int]:
+    """Return the distinct prime factors of `n` in increasing order."""
+    factors = []
+    d = 2
+    while d * d <= n:
+        if n % d == 0:
+            factors.append(d)
+            while n % d == 0:
+                n //= d
+        d += 1
+    if n > 1:
+        factors.append(n)
+
+    return factors
+
+
+def primitive_root(p: int) -> int:
+    """Return the smallest generator of the multiplicative group modulo the prime `p`."""
+    factors = prime_factors(p - 1)
+    for g in range(1, p):
+        if all(pow(g, (p - 1) // f, p) != 1 for f in factors):
+            return g
+
+    raise ValueError(f"{p} is not prime")
+
+
+# ---------------------------------------------------------------------------- #
+#                            Finite field arithmetic                           #
+# ---------------------------------------------------------------------------- #
+
+
+def _primitive_polynomial(q: int, degree: int) -> tuple[int, ...]:
+    """Find (a_1, ..., a_degree) such that x^degree + a_1 x^(degree-1) + ... + a_degree is primitive over GF(q).
+
+    Only degrees 2 and 3 are supported: a polynomial of such a degree without roots is irreducible.
+    """
+    order = q**degree - 1
+    factors = prime_factors(order)
+    one = (1,) + (0,) * (degree - 1)
+
+    for coefficients in product(range(q), repeat=degree):
+        if coefficients[-1] == 0:
+            continue
+        if any(_evaluate(coefficients, x, q) == 0 for x in range(q)):
+            continue
+        if all(_x_power(order // f, coefficients, q) != one for f in factors):
+            return coefficients
+
+    raise ValueError(f"{q} is not prime")
+
+
+def _evaluate(coefficients: tuple[int, ...], x: int, q: int) -> int:
+    """Evaluate the monic polynomial with lower `coefficients` at `x` modulo `q`."""
+    value = 1
+    for c in coefficients:
+        value = (value * x + c) % q
+    return value
+
+
+def _x_power(e: int, coefficients: tuple[int, ...], q: int) -> tuple[int, ...]:
+    """Compute the coefficients (of 1, x, x^2, ...) of x^e modulo the monic polynomial over GF(q)."""
+    degree = len(coefficients)
+    # x^degree = -(a_1 x^(degree-1) + ... + a_degree)
+    reduction = [-c for c in reversed(coefficients)]
+
+    def mul(u, v):
+        prod = [0] * (2 * degree - 1)
+        for i in range(degree):
+            for j in range(degree):
+                prod[i + j] += u[i] * v[j]
+        for d in range(2 * degree - 2, degree - 1, -1):
+            coef = prod[d]
+            prod[d] = 0
+            for k in range(degree):
+                prod[d - degree + k] += reduction[k] * coef
+        return tuple(p % q for p in prod[:degree])
+
+    result = (1,) + (0,) * (degree - 1)
+    base = (0, 1) + (0,) * (degree - 2)
+    while e:
+        if e & 1:
+            result = mul(result, base)
+        base = mul(base, base)
+        e >>= 1
+
+    return result
+
+
+def _x_powers(coefficients: tuple[int, ...], q: int, count: int) -> np.ndarray:
+    """Return the coefficients of x^0, ..., x^(count - 1) modulo the monic polynomial over GF(q).
+
+    Row i holds the coefficients of x^i on 1, x, x^2, ... The rows are filled by doubling: with the
+    matrix M of the multiplication by x, rows [k, 2k) are rows [0, k) multiplied by M^k.
+    """
+    degree = len(coefficients)
+    step = np.zeros((degree, degree), dtype=np.int64)
+    # Column j is x * x^j
+    for j in range(degree - 1):
+        step[j + 1, j] = 1
+    step[:, degree - 1] = [(-c) % q for c in reversed(coefficients)]
+
+    powers = np.zeros((count, degree), dtype=np.int64)
+    powers[0, 0] = 1
+    filled, jump = 1, step
+    while filled < count:
+        n = min(filled, count - filled)
+        powers[filled : filled + n] = (powers[:n] @ jump.T) % q
+        filled += n
+        jump = (jump @ jump) % q
+
+    return powers
+
+
+def _modular_powers(g: int, p: int, count: int) -> np.ndarray:
+    """Return g^0, ..., g^(count - 1) modulo `p`, filled by doubling like `_x_powers`."""
+    powers = np.ones(count, dtype=np.int64)
+    filled, jump = 1, g % p
+    while filled < count:
+        n = min(filled, count - filled)
+        powers[filled : filled + n] = (powers[:n] * jump) % p
+        filled += n
+        jump = jump * jump % p
+
+    return powers
+
+
+# ---------------------------------------------------------------------------- #
+#                                 Constructions                                #
+# ---------------------------------------------------------------------------- #
+
+
+def erdos_turan(odd_prime: int) -> list[int]:
+    """Return the Erdős–Turán golomb ruler with `odd_prime` marks and length below 2 * p^2."""
+    k = np.arange(odd_prime, dtype=np.int64)
+    return (2 * odd_prime * k + (k * k) % odd_prime).tolist()
+
+
+@lru_cache(maxsize=None)
+def ruzsa(prime: int) -> tuple[list[int], int]:
+    """Return the Ruzsa modular golomb ruler with `prime - 1` marks modulo `prime * (prime - 1)`."""
+    modulus = prime * (prime - 1)
+    i = np.arange(1, prime, dtype=np.int64)
+    powers = _modular_powers(primitive_root(prime), prime, prime)[1:]
+    marks = np.sort((prime * i + (prime - 1) * powers) % modulus)
+
+    return marks.tolist(), modulus
+
+
+@lru_cache(maxsize=None)
+def singer(prime: int) -> tuple[list[int], int]:
+    """Return the Singer modular golomb ruler with `prime + 1` marks modulo `prime^2 + prime + 1`.
+
+    The marks are the exponents `i` for which `x^i` lies in the plane spanned by 1 and `x` in
+    GF(prime^3), built from a primitive cubic polynomial. Since x^modulus lies in GF(prime), only the
+    first `modulus` exponents need to be looked at.
+    """
+    modulus = prime * prime + prime + 1
+    powers = _x_powers(_primitive_polynomial(prime, 3), prime, modulus)
+    (marks,) = np.nonzero(powers[:, 2] == 0)
+
+    return marks.tolist(), modulus
+
+
+@lru_cache(maxsize=None)
+def bose_chowla(prime: int) -> tuple[list[int], int]:
+    """Return the Bose–Chowla modular golomb ruler with `prime` marks modulo `prime^2 - 1`.
+
+    With θ a primitive element of GF(prime^2), the marks are the exponents `i` for which θ^i - θ
+    lies in GF(prime), that is the exponents where the coefficient of θ in θ^i is 1.
+    """
+    modulus = prime * prime - 1
+    powers = _x_powers(_primitive_polynomial(prime, 2), prime, modulus)
+    (marks,) = np.nonzero(powers[:, 1] == 1)
+
+    return marks.tolist(), modulus
+
+
+def truncate_modular(marks: list[int], modulus: int, order: int) -> list[int]:
+    """Return the shortest golomb ruler formed by `order` cyclically consecutive `marks`."""
+    k = len(marks)
+    if order > k:
+        raise ValueError(f"Cannot take {order} marks out of {k}")
+
+    sorted_marks = np.sort(np.asarray(marks, dtype=np.int64))
+    extended = np.concatenate([sorted_marks, sorted_marks[: order - 1] + modulus])
+    spans = extended[order - 1 : order - 1 + k] - extended[:k]
+    start = int(np.argmin(spans))
+
+    return (extended[start : start + order] - extended[start]).tolist()
+
+
+def truncate(marks: list[int], order: int) -> list[int]:
+    """Return the shortest golomb ruler formed by `order` consecutive `marks` of a golomb ruler."""
+    k = len(marks)
+    if order > k:
+        raise ValueError(f"Cannot take {order} marks out of {k}")
+
+    sorted_marks = np.sort(np.asarray(marks, dtype=np.int64))
+    spans = sorted_marks[order - 1 :] - sorted_marks[: k - order + 1]
+    start = int(np.argmin(spans))
+
+    return (sorted_marks[start : start + order] - sorted_marks[start]).tolist()
+
+
+def affine_truncations(
+    marks: list[int], modulus: int, order: int, max_multipliers: int = None
+) -> list[int]:
+    """Return the shortest window of `order` marks among the affine images of a modular ruler.
+
+    For every a coprime with `modulus`, {a x mod modulus} is a modular golomb ruler as well, and
+    translating it only rotates its windows. Multipliers a and -a give mirror images, so only
+    a < modulus / 2 is tried, the `max_multipliers` smallest ones when given.
+    """
+    k = len(marks)
+    if order > k:
+        raise ValueError(f"Cannot take {order} marks out of {k}")
+
+    multipliers = np.arange(1, (modulus + 1) // 2, dtype=np.int64)
+    multipliers = multipliers[np.gcd(multipliers, modulus) == 1][:max_multipliers]
+
+    best_span, best = None, None
+    marks = np.asarray(marks, dtype=np.int64)
+    # Bound the size of the (multipliers, marks) matrices
+    chunk = max(1, (1 << 22) // max(k, 1))
+    for first in range(0, len(multipliers), chunk):
+        images = np.sort((multipliers[first : first + chunk, None] * marks) % modulus, axis=1)
+        extended = np.concatenate([images, images[:, : order - 1] + modulus], axis=1)
+        spans = extended[:, order - 1 : order - 1 + k] - extended[:, :k]
+        row, start = np.unravel_index(np.argmin(spans), spans.shape)
+        if best_span is None or spans[row, start] < best_span:
+            best_span = spans[row, start]
+            best = extended[row, start : start + order] - extended[row, start]
+
+    return best.tolist()
+
+
+# ---------------------------------------------------------------------------- #
+#                                   Selection                                  #
+# ---------------------------------------------------------------------------- #
+
+# Number of multipliers tried by `best_construction` for each modular ruler
+DEFAULT_MAX_MULTIPLIERS = 256
+
+# Number of primes tried for each construction, starting with the smallest that is large enough
+_PRIMES_PER_CONSTRUCTION = 2
+
+
+def _primes_from(n: int, count: int) -> list[int]:
+    primes = [next_prime(n)]
+    while len(primes) < count:
+        primes.append(next_prime(primes[-1] + 1))
+    return primes
+
+
+# Modular construction -> smallest prime giving at least `order` marks
+MODULAR_CONSTRUCTIONS = {
+    "singer": (singer, lambda order: max(order - 1, 2)),
+    "bose_chowla": (bose_chowla, lambda order: max(order, 2)),
+    "ruzsa": (ruzsa, lambda order: max(order + 1, 3)),
+}
+
+
+def best_construction(
+    order: int, max_multipliers: int = DEFAULT_MAX_MULTIPLIERS
+) -> tuple[list[int], str]:
+    """Return the shortest ruler with `order` marks built algebraically, and the construction name.
+
+    Modular constructions are transformed by `affine_truncations` with up to `max_multipliers`
+    multipliers and the Erdős–Turán ruler is truncated.
+    """
+    if order < 1:
+        raise ValueError("order must be greater than 0")
+    if order <= 2:
+        return list(range(order)), "trivial"
+
+    candidates = []
+    for name, (construction, smallest_prime) in MODULAR_CONSTRUCTIONS.items():
+        for prime in _primes_from(smallest_prime(order), _PRIMES_PER_CONSTRUCTION):
+            marks, modulus = construction(prime)
+            candidates.append(
+                (affine_truncations(marks, modulus, order, max_multipliers), name)
+            )
+
+    for prime in _primes_from(max(order, 3), _PRIMES_PER_CONSTRUCTION):
+        candidates.append((truncate(erdos_turan(prime), order), "erdos_turan"))
+
+    return min(candidates, key=lambda candidate: candidate[0][-1])
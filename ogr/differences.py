@@ -0,0 +1,124 @@
+"""Definition of the `DifferenceSet` class."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+
+from .exceptions import NotGolombRuler
+
+
+class DifferenceSet:
+    """Set of marks whose pairwise differences are all distinct, backed by integer bitmasks.
+
+    Bit `m` of the mark mask is set when `m` is a mark and bit `d` of the difference mask is set when
+    `d` is the difference of two marks. Adding, checking or removing a mark touches every other mark
+    once, so each operation runs in O(n) without copying the marks.
+    """
+
+    __slots__ = ("_marks", "_mark_bits", "_distance_bits", "_reach")
+
+    def __init__(self, marks: Iterable[int] = ()):
+        """Construct a new DifferenceSet containing `marks`.
+
+        Raises `NotGolombRuler` if two pairs of marks share the same difference.
+        """
+        self._marks: list[int] = []
+        self._mark_bits = 0
+        self._distance_bits = 0
+        # Bit `k` is set when there is a mark at `self.length() - k`.
+        self._reach = 0
+
+        for mark in marks:
+            self.add(mark)
+
+    def __len__(self) -> int:
+        return len(self._marks)
+
+    def __contains__(self, mark: int) -> bool:
+        return mark >= 0 and (self._mark_bits >> mark) & 1 == 1
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(sorted(self._marks))
+
+    def __repr__(self) -> str:
+        return f"DifferenceSet({sorted(self._marks)})"
+
+    def length(self) -> int:
+        """Return the largest mark, or -1 if the set is empty."""
+        return self._mark_bits.bit_length() - 1
+
+    def has_distance(self, distance: int) -> bool:
+        """Check if `distance` is the difference of two marks."""
+        return distance > 0 and (self._distance_bits >> distance) & 1 == 1
+
+    def distances(self) -> list[int]:
+        """Return the differences of every pair of marks in increasing order."""
+        bits = self._distance_bits
+        return [d for d in range(bits.bit_length()) if (bits >> d) & 1]
+
+    def can_add(self, mark: int) -> bool:
+        """Check if `mark` can be added without repeating a difference."""
+        return self._new_distances(mark) is not None
+
+    def add(self, mark: int):
+        """Add `mark` to the set.
+
+        Raises `NotGolombRuler` if `mark` repeats a difference or is already in the set.
+        """
+        new = self._new_distances(mark)
+        if new is None:
+            raise NotGolombRuler(
+                f"Adding mark {mark} to {self!r} repeats a difference."
+            )
+
+        top = self.length()
+        if mark > top:
+            self._reach = (self._reach << (mark - top)) | 1 if top >= 0 else 1
+        else:
+            self._reach |= 1 << (top - mark)
+
+        self._marks.append(mark)
+        self._mark_bits |= 1 << mark
+        self._distance_bits |= new
+
+    def remove(self, mark: int):
+        """Remove `mark` from the set, freeing all of its differences.
+
+        Raises `KeyError` if `mark` is not in the set.
+        """
+        if mark not in self:
+            raise KeyError(mark)
+
+        self._marks.remove(mark)
+        for other in self._marks:
+            self._distance_bits &= ~(1 << abs(mark - other))
+
+        top = self.length()
+        self._mark_bits &= ~(1 << mark)
+        if not self._marks:
+            self._reach = 0
+        elif mark == top:
+            # Re-anchor the reach on the new largest mark.
+            self._reach = (self._reach & ~1) >> (top - self.length())
+        else:
+            self._reach &= ~(1 << (top - mark))
+
+    def _new_distances(self, mark: int) -> int | None:
+        """Return the bitmask of differences created by `mark`, or `None` if one of them is taken."""
+        if mark < 0 or mark in self:
+            return None
+
+        top = self.length()
+        if mark > top:
+            # Every mark lies to the left, so the new differences are the reach shifted in one go.
+            new = self._reach << (mark - top)
+            return None if new & self._distance_bits else new
+
+        new = 0
+        for other in self._marks:
+            bit = 1 << abs(mark - other)
+            if bit & (new | self._distance_bits):
+                return None
+            new |= bit
+
+        return new
@@ -0,0 +1,213 @@
+"""Exhaustive search for Optimal Golomb Rulers split into independent work units.
+
+Like the OGR projects of distributed.net, the search space is partitioned by the positions of the
+first marks: every golomb prefix 0 < x_1 < ... < x_k is a work unit, searched by the kernel of
+`ogr.search` for a ruler strictly shorter than the best one known. Units run on a pool of processes
+that share the best length found so far, so that a ruler found by one worker stops the other ones
+from trying that length or longer ones.
+
+The completed units and the best ruler are checkpointed to a JSON file, so an interrupted search
+resumes where it stopped: a completed unit never contains a ruler shorter than the best one, since
+the best length only decreases.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import signal
+import time
+from functools import partial
+
+from . import bounds
+from .checkpoint import checkpoint_path, read_checkpoint, write_checkpoint
+from .ruler import GolombRuler
+from .search import search_length, solve_exact
+
+# Number of marks after 0 fixed by each work unit
+DEFAULT_PREFIX_DEPTH = 2
+
+# Minimum time between two checkpoints
+DEFAULT_CHECKPOINT_INTERVAL_S = 10
+
+
+def search_checkpoint_path(order: int) -> str:
+    """Return the default checkpoint of the search for rulers with `order` marks."""
+    return checkpoint_path(f"search_{order}")
+
+
+def search_parallel(
+    order: int,
+    prefix_depth: int = DEFAULT_PREFIX_DEPTH,
+    max_workers: int = None,
+    checkpoint: str = None,
+    resume=False,
+    checkpoint_interval_s: float = DEFAULT_CHECKPOINT_INTERVAL_S,
+    verbose=False,
+) -> GolombRuler:
+    """Find an optimal golomb ruler with `order` marks on a pool of `max_workers` processes.
+
+    The search starts from the shortest of the greedy and algebraic rulers and looks for strictly
+    shorter ones, pruned with the optimal lengths of the smaller orders that `search.solve_exact`
+    finds first. `checkpoint` defaults to `search_checkpoint_path(order)`; with `resume`, the prefix depth,
+    the completed units and the best ruler stored there are reused.
+    """
+    if order < 1:
+        raise ValueError("order must be greater than 0")
+    if order <= 3:
+        return GolombRuler([0, 1, 3][:order])
+
+    checkpoint = checkpoint or search_checkpoint_path(order)
+
+    state = _load_checkpoint(checkpoint, order) if resume else None
+    if state is None:
+        prefix_depth = max(1, min(prefix_depth, order - 2))
+        state = dict(
+            order=order, prefix_depth=prefix_depth, best=list(bounds.heuristic_ruler(order)), done=[]
+        )
+    done = {tuple(prefix) for prefix in state["done"]}
+
+    best = multiprocessing.Value("q", state["best"][-1])
+    spans = _spans(order)
+    units = [
+        unit
+        for unit in _prefixes(order, state["prefix_depth"], best.value, spans)
+        if unit not in done
+    ]
+    if verbose:
+        print(
+            f"=> order {order}: {len(units)} units left, best length {best.value}"
+        )
+
+    pool = multiprocessing.Pool(max_workers, initializer=_init_worker, initargs=(best, spans))
+    # Preemption sends SIGTERM, stop like on Ctrl-C so that the checkpoint is written
+    previous_handler = signal.signal(signal.SIGTERM, _raise_interrupt)
+    last_checkpoint = time.time()
+    try:
+        results = pool.imap_unordered(
+            partial(_search_unit, order), units, chunksize=1
+        )
+        for count, (unit, marks) in enumerate(results, 1):
+            done.add(unit)
+            if marks is not None and marks[-1] < state["best"][-1]:
+                state["best"] = marks
+                if verbose:
+                    print(f"=> found length {marks[-1]}: {marks}")
+
+            if time.time() - last_checkpoint >= checkpoint_interval_s:
+                _save_checkpoint(checkpoint, state, done)
+                last_checkpoint = time.time()
+                if verbose:
+                    print(f"=> {count}/{len(units)} units searched")
+        pool.close()
+    finally:
+        # Units still running are lost, they are searched again on resume
+        pool.terminate()
+        pool.join()
+        signal.signal(signal.SIGTERM, previous_handler)
+        _save_checkpoint(checkpoint, state, done)
+
+    return GolombRuler(state["best"])
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _spans(order: int) -> list[int]:
+    """spans[k] is a lower bound on the length of any golomb ruler with k marks.
+
+    The smaller orders span their optimal length, found by `search.solve_exact` rather than read
+    from the table of `ogr.bounds`, which would leave the search nothing to find. A ruler with
+    `order` marks is only known to be longer than those and to have n(n - 1)/2 distinct differences.
+    """
+    spans = [0] + [solve_exact(k).length() for k in range(1, order)]
+    spans.append(max(spans[-1] + 1, order * (order - 1) // 2))
+    return spans
+
+
+def _prefixes(order: int, depth: int, best: int, spans: list[int]) -> list[tuple[int, ...]]:
+    """Return the golomb prefixes (x_1, ..., x_depth) that may lead to a ruler shorter than `best`."""
+    prefixes = []
+
+    def extend(prefix: list[int], differences: set[int]):
+        index = len(prefix)
+        if index == depth + 1:
+            prefixes.append(tuple(prefix[1:]))
+            return
+
+        pos = prefix[-1]
+        # The marks index..order - 1 span at least spans[order - index]
+        for mark in range(pos + 1, best - spans[order - index]):
+            new = {mark - m for m in prefix}
+            if new & differences:
+                continue
+            # Mirror symmetry: the first gap is smaller than the last one, so below half the length
+            if index == 1 and 2 * mark >= best:
+                break
+            extend(prefix + [mark], differences | new)
+
+    extend([0], set())
+    return prefixes
+
+
+# ---------------------------------------------------------------------------- #
+#                                    Workers                                   #
+# ---------------------------------------------------------------------------- #
+
+# Best length shared by every worker of the pool
+_BEST = None
+
+# `_spans(order)`, computed once by the parent process
+_SPANS = None
+
+
+def _init_worker(best, spans: list[int]):
+    global _BEST, _SPANS
+    _BEST = best
+    _SPANS = spans
+
+
+def _search_unit(order: int, prefix: tuple[int, ...]) -> tuple[tuple[int, ...], list[int] | None]:
+    """Search the rulers starting with 0 and `prefix` for one shorter than the shared best length.
+
+    Lengths are tried in increasing order with `search.search_length`, so the first ruler found is
+    the shortest of the unit. Return the prefix along with that ruler, if any.
+    """
+    spans = _SPANS
+    # The marks from the end of the prefix to the last one span at least spans[order - len(prefix)]
+    length = max(spans[order], prefix[-1] + spans[order - len(prefix)])
+
+    while length < _BEST.value:
+        marks = search_length(order, length, spans, prefix)
+        if marks is not None:
+            _publish(length)
+            return prefix, marks
+        length += 1
+
+    return prefix, None
+
+
+def _publish(length: int):
+    """Lower the shared best length to `length`."""
+    with _BEST.get_lock():
+        if length < _BEST.value:
+            _BEST.value = length
+
+
+# ---------------------------------------------------------------------------- #
+#                                  Checkpoints                                 #
+# ---------------------------------------------------------------------------- #
+
+
+def _load_checkpoint(path: str, order: int) -> dict | None:
+    """Return the state stored at `path`, or None if there is none for `order`."""
+    state = read_checkpoint(path)
+    if state is None or state.get("order") != order:
+        return None
+    return state
+
+
+def _save_checkpoint(path: str, state: dict, done: set[tuple[int, ...]]):
+    """Write `state` with the completed units `done` to `path`."""
+    state["done"] = sorted(done)
+    write_checkpoint(path, state)
@@ -0,0 +1,137 @@
+"""Lazy enumeration of the rulers with a given length.
+
+Rulers are generated mark by mark with a depth-first search and handed out in batches, so that
+enumerating a length whose rulers don't fit in memory only ever holds one batch. When only golomb
+rulers are requested, a partial ruler is abandoned as soon as two of its differences collide
+instead of filtering complete rulers afterwards.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+# Number of rulers yielded at once by `iter_rulers`
+DEFAULT_BATCH_SIZE = 4096
+
+
+def iter_rulers(
+    length: int,
+    order: int = None,
+    golomb_only=True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    after: list[int] = None,
+) -> Iterator[list[list[int]]]:
+    """Yield every ruler whose first mark is 0 and last mark is `length`, `batch_size` at a time.
+
+    `order` restricts the rulers to exactly `order` marks and `golomb_only` to golomb rulers. When
+    `after` is given, the enumeration resumes right after that ruler.
+    """
+    batch = []
+    for marks in iter_marks(length, order, golomb_only, after):
+        batch.append(marks)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def count_rulers(length: int, order: int = None, golomb_only=True) -> int:
+    """Count the rulers enumerated by `iter_rulers` without keeping any of them."""
+    return sum(1 for _ in iter_marks(length, order, golomb_only))
+
+
+def iter_marks(
+    length: int, order: int = None, golomb_only=True, after: list[int] = None
+) -> Iterator[list[int]]:
+    """Yield the marks of every ruler enumerated by `iter_rulers`, one ruler at a time.
+
+    When `after` is given, only the rulers enumerated after it are yielded.
+    """
+    if length < 0 or (order is not None and order < 1):
+        return
+    if length == 0:
+        if order in (None, 1) and after is None:
+            yield [0]
+        return
+    if order == 1:
+        return
+
+    # Marks strictly between 0 and `length`
+    inner = None if order is None else order - 2
+    prefix = [0]
+
+    # Depth-first search over the inner marks, in increasing order. Each frame of the stack holds
+    # the next candidate position along with the state of the ruler before placing it:
+    # `back` has bit b set when a mark lies b before the last placed mark and `used` holds the
+    # differences taken so far, including the ones with the mark at `length`.
+    stack = [(1, 0, 1 << length)]
+
+    if after is not None:
+        if inner == 0:
+            return
+        # Rebuild the state of the search right after it yielded `after`
+        stack, prefix = _resume_state(length, inner, after)
+    elif inner is None or inner == 0:
+        yield [0, length]
+        if inner == 0:
+            return
+
+    while stack:
+        candidate, back, used = stack.pop()
+        pos = prefix[-1]
+
+        # Keep enough room for the inner marks that are still missing
+        missing = 0 if inner is None else inner - (len(prefix) - 1)
+        last = length - max(missing - 1, 0)
+
+        while candidate < last:
+            shift = candidate - pos
+            new = (back | 1) << shift
+            to_end = 1 << (length - candidate)
+            if golomb_only and (new & used or to_end & (used | new)):
+                candidate += 1
+                continue
+            break
+        else:
+            # No candidate left at this depth, backtrack
+            if len(prefix) > 1:
+                prefix.pop()
+            continue
+
+        # Come back to the next candidate after exploring this one
+        stack.append((candidate + 1, back, used))
+        prefix.append(candidate)
+
+        if inner is None or len(prefix) - 1 == inner:
+            yield prefix + [length]
+
+        if inner is None or len(prefix) - 1 < inner:
+            stack.append((candidate + 1, new, used | new | to_end))
+        else:
+            prefix.pop()
+
+
+def _resume_state(
+    length: int, inner: int | None, after: list[int]
+) -> tuple[list[tuple[int, int, int]], list[int]]:
+    """Return the stack and prefix of `iter_marks` right after it yielded the ruler `after`."""
+    stack = []
+    prefix = [0]
+    back, used = 0, 1 << length
+    for candidate in after[1:-1]:
+        shift = candidate - prefix[-1]
+        new = (back | 1) << shift
+        to_end = 1 << (length - candidate)
+        stack.append((candidate + 1, back, used))
+        prefix.append(candidate)
+        back, used = new, used | new | to_end
+
+    if inner is None:
+        # The search goes deeper after yielding a ruler
+        stack.append((prefix[-1] + 1, back, used))
+    elif len(prefix) > 1:
+        prefix.pop()
+
+    return stack, prefix
@@ -23,3 +23,11 @@ class OrderTooLarge(Exception):
 
 class ImplementationError(Exception):
     """Used to indicate that the program's code is not correct."""
+
+
+class InfeasibleInstance(Exception):
+    """Used when no golomb ruler satisfies the requested order and upper bound."""
+
+
+class SearchTimeout(Exception):
+    """Used when a search runs out of time before finding a ruler."""
@@ -6,8 +6,11 @@ A Golomb ruler is a sequence of non-negative integers such that every difference
 
 from __future__ import annotations
 
+from collections.abc import Iterator
+
+import numpy as np
+
 from .exceptions import ImplementationError
-from .utils import compute_distances, dist
 
 
 def generate_golomb_ruler_naive(order: int) -> list[int]:
@@ -27,50 +30,93 @@ def generate_golomb_ruler_naive(order: int) -> list[int]:
 def generate_golomb_ruler_improved(order: int) -> list[int]:
     """Generate a golomb ruler with order `order` using an improved algorithm.
 
-    This algorithm runs in O(n^4)
+    Each mark is the smallest integer that keeps the golomb property, so the ruler with `order`
+    marks extends the one with `order - 1` marks. The marks are memoized across calls.
     """
     if order < 1:
-        ValueError("order must be greater than 0")
-    if order == 1:
-        return [0]
-    if order == 2:
-        return [0, 1]
-    if order == 3:
-        return [0, 1, 3]
+        raise ValueError("order must be greater than 0")
 
-    prev = generate_golomb_ruler_improved(order - 1)
+    _GREEDY.extend_to(order)
+    return _GREEDY.marks[:order]
 
-    # Compute the differences
-    distances = compute_distances(prev)  # O(n^2)
-    candidate_upper_bound = (
-        2 * prev[-1] + 1
-    )  # Guarantees that we will accept at least one candidate
 
-    def should_accept_candidate(candidate: int) -> bool:
-        """Utility function used to check if a candidate should be accepted.
+def generate_golomb_rulers_improved(max_order: int) -> Iterator[list[int]]:
+    """Yield the rulers of `generate_golomb_ruler_improved` for every order from 1 to `max_order`.
 
-        Allows us to skip to the next loop on a false input (otherwise we only break from an inner loop)
+    All of them are built in a single pass.
+    """
+    for order in range(1, max_order + 1):
+        yield generate_golomb_ruler_improved(order)
 
-        Runs in O(n)
-        """
-        for i in range(order - 1):
-            if dist(candidate, prev[i]) in distances:
-                return False
 
-        return True
+class _GreedySequence:
+    """The prefix of the greedy golomb sequence 0, 1, 3, 7, 12, ... computed so far.
 
-    for c in range(prev[-1], candidate_upper_bound + 1):
-        # O(n) check to make sure that c != x_i for all i in 1..n
-        # we could turn previous into a set to speed up this but that wouldn't
-        # change asymptotic complexity
-        if c in prev:
-            continue
+    A candidate x cannot be added when x - m is already a difference for some mark m, that is when x
+    lies in the sum set of the marks and the differences. The part of that sum set beyond the last
+    mark is kept in a byte array starting at `_offset`, so that the next mark is found with a single
+    scan for the first free position.
 
-        if should_accept_candidate(c):
-            prev.append(c)
-            return sorted(prev)
+    Only the sums beyond the new mark matter for the next ones. Those of an older mark m_j with a new
+    difference mark - m_i, for m_j > m_i, are mark + (m_j - m_i): a new mark only adds its own sums
+    with the old differences and with its new ones, n (n + 1) / 2 writes done in bounded chunks.
+    """
 
-    raise ImplementationError("Implementation Error!!!")
+    # Sums written at once, bounds the temporary buffer of the writes
+    _CHUNK = 1 << 16
+
+    def __init__(self):
+        self.marks = [0]
+        # Buffer grown geometrically, only the first n (n - 1) / 2 differences are used
+        self._differences = np.zeros(16 * 15 // 2, dtype=np.int64)
+        self._count = 0
+        self._forbidden = bytearray(4)
+        self._offset = 0
+
+    def extend_to(self, order: int):
+        """Compute the marks until there are at least `order` of them."""
+        while len(self.marks) < order:
+            last = self.marks[-1]
+            # The differences of x = 2 * last + 1 with the marks are all larger than `last`
+            offset = self._offset
+            mark = self._forbidden.find(0, last + 1 - offset, 2 * last + 2 - offset)
+            if mark == -1:
+                raise ImplementationError("Implementation Error!!!")
+            self._add(mark + offset)
+
+    def _add(self, mark: int):
+        n = len(self.marks)
+        count = self._count
+        if count + n > len(self._differences):
+            self._differences = np.resize(
+                self._differences, max(count + n, 2 * len(self._differences))
+            )
+
+        # The next marks are larger than `mark`, and deleting the front of a bytearray doesn't copy it
+        del self._forbidden[: mark + 1 - self._offset]
+        self._offset = mark + 1
+        # Every sum is at most 2 * mark and the next mark is at most 2 * mark + 1
+        size = len(self._forbidden)
+        if size < mark + 1:
+            self._forbidden.extend(bytes(mark + 1 - size))
+
+        forbidden = np.frombuffer(self._forbidden, dtype=np.uint8)
+        new_differences = self._differences[count : count + n]
+        np.subtract(mark, self.marks, out=new_differences)
+        self._count = count + n
+
+        sums = np.empty(min(self._CHUNK, self._count), dtype=np.int64)
+        for start in range(0, self._count, self._CHUNK):
+            chunk = self._differences[start : min(start + self._CHUNK, self._count)]
+            out = sums[: len(chunk)]
+            np.add(chunk, mark - self._offset, out=out)
+            forbidden[out] = 1
+        del forbidden
+
+        self.marks.append(mark)
+
+
+_GREEDY = _GreedySequence()
 
 
 # def main():
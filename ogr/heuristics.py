@@ -0,0 +1,332 @@
+"""Local search for short golomb rulers of large orders, without any proof of optimality.
+
+A search starts from the shortest ruler of `bounds.heuristic_ruler` and repeatedly tries to fit
+the same number of marks one unit shorter. With the first and last marks pinned at 0 and the
+target length, the inner marks are moved around to remove the collisions, the pairs of marks that
+repeat a distance, as counted by a `MutableRuler`. Once none is left, the ruler is golomb, becomes
+the best one and the target shrinks again, until the time budget is spent.
+
+Three strategies remove the collisions: simulated annealing, tabu search and a genetic algorithm
+whose children are repaired by annealing. Independent searches run on every core with
+`optimize`, which returns the shortest ruler found.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import random
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from functools import partial
+
+from . import bounds
+from .mutable import MutableRuler
+from .ruler import GolombRuler
+
+DEFAULT_TIME_BUDGET_S = 60
+
+# Inner marks compared to pick the one to move, the one with the most collisions wins
+_TOURNAMENT_SIZE = 4
+
+# Destinations evaluated per move of the tabu search
+_TABU_DESTINATIONS = 16
+
+# Rulers kept by the genetic algorithm
+_POPULATION_SIZE = 12
+
+# Steps between two reads of the clock
+_CLOCK_STEPS = 256
+
+
+class Heuristic(Enum):
+    """The strategies removing the collisions of a ruler with a fixed length."""
+
+    SimulatedAnnealing = 1
+    TabuSearch = 2
+    Genetic = 3
+
+    def callback(self) -> Callable[[MutableRuler, int, random.Random, float], bool]:
+        """Return the function removing the collisions of a ruler before a deadline."""
+        if self == Heuristic.SimulatedAnnealing:
+            return _anneal
+        elif self == Heuristic.TabuSearch:
+            return _tabu
+        elif self == Heuristic.Genetic:
+            return _genetic
+
+    def from_str(input: str) -> Heuristic:
+        """Raises `ValueError` on bad input."""
+        input = input.lower()
+        if input == "sa":
+            return Heuristic.SimulatedAnnealing
+        elif input == "tabu":
+            return Heuristic.TabuSearch
+        elif input == "ga":
+            return Heuristic.Genetic
+        else:
+            raise ValueError
+
+
+def optimize(
+    order: int,
+    heuristic: Heuristic = Heuristic.SimulatedAnnealing,
+    time_budget_s: float = DEFAULT_TIME_BUDGET_S,
+    starts: int = None,
+    max_workers: int = None,
+    seed: int = None,
+    verbose=False,
+) -> GolombRuler:
+    """Return the shortest ruler with `order` marks found by `starts` searches of `time_budget_s`.
+
+    `starts` defaults to the number of processors and the searches run on a pool of `max_workers`
+    processes, so the whole call takes about `time_budget_s` when there is a core per search.
+    """
+    starts = starts or os.cpu_count() or 1
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(64) for _ in range(starts)]
+
+    search_one = partial(_search_marks, order, heuristic, time_budget_s)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        rulers = list(executor.map(search_one, seeds))
+
+    best = min(rulers, key=lambda marks: marks[-1])
+    if verbose:
+        lengths = sorted(marks[-1] for marks in rulers)
+        print(f"=> order {order}: lengths {lengths}, best {best}")
+    return GolombRuler(best, assert_golomb_property=False)
+
+
+def search(
+    order: int,
+    heuristic: Heuristic = Heuristic.SimulatedAnnealing,
+    time_budget_s: float = DEFAULT_TIME_BUDGET_S,
+    seed: int = None,
+    marks: list[int] = None,
+) -> GolombRuler:
+    """Shorten the ruler `marks`, by default the one of `bounds.heuristic_ruler`, for `time_budget_s`.
+
+    Stops early when the length reaches `bounds.lower_bound`.
+    """
+    return GolombRuler(
+        _search_marks(order, heuristic, time_budget_s, seed, marks),
+        assert_golomb_property=False,
+    )
+
+
+def _search_marks(
+    order: int,
+    heuristic: Heuristic,
+    time_budget_s: float,
+    seed: int = None,
+    marks: list[int] = None,
+) -> list[int]:
+    if order < 1:
+        raise ValueError("order must be greater than 0")
+
+    best = sorted(marks) if marks is not None else list(bounds.heuristic_ruler(order))
+    best = [m - best[0] for m in best]
+    if len(best) != order:
+        raise ValueError(f"The ruler {best} doesn't have {order} marks")
+
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + time_budget_s
+    floor = bounds.lower_bound(order)
+    remove_collisions = heuristic.callback()
+
+    while order > 3 and best[-1] > floor and time.perf_counter() < deadline:
+        length = best[-1] - 1
+        ruler = _fit(best, length, rng)
+        if not remove_collisions(ruler, length, rng, deadline):
+            break
+        best = ruler.sequence
+
+    return best
+
+
+def _fit(marks: list[int], length: int, rng: random.Random) -> MutableRuler:
+    """Return a ruler with as many marks as `marks`, between 0 and `length`, by squeezing them.
+
+    The marks that land on an already taken position are placed at random.
+    """
+    scale = length / marks[-1]
+    inner = {min(length - 1, max(1, round(m * scale))) for m in marks[1:-1]}
+    free = [p for p in range(1, length) if p not in inner]
+    inner.update(rng.sample(free, len(marks) - 2 - len(inner)))
+    return MutableRuler([0, *inner, length])
+
+
+def _pick_mark(ruler: MutableRuler, inner: list[int], rng: random.Random) -> int:
+    """Return one of a few random inner marks, the one with the most collisions."""
+    candidates = [rng.choice(inner) for _ in range(_TOURNAMENT_SIZE)]
+    return max(candidates, key=ruler.mark_collisions)
+
+
+def _destination(ruler: MutableRuler, length: int, rng: random.Random) -> int:
+    """Return a random free position strictly between 0 and `length`."""
+    while True:
+        to = rng.randrange(1, length)
+        if to not in ruler:
+            return to
+
+
+# ---------------------------------------------------------------------------- #
+#                                  Strategies                                  #
+# ---------------------------------------------------------------------------- #
+# Each one moves the inner marks of `ruler`, whose marks 0 and `length` stay in place, and returns
+# whether its collisions are all gone before `deadline`.
+
+
+def _anneal(
+    ruler: MutableRuler,
+    length: int,
+    rng: random.Random,
+    deadline: float,
+    max_steps: int = None,
+    temperature: float = 2.0,
+    cooling: float = 0.9995,
+    min_temperature: float = 0.05,
+) -> bool:
+    """Simulated annealing: accept a move that adds collisions with probability exp(-delta / T).
+
+    The temperature is reset once it's cold, to escape the local minima.
+    """
+    inner = [m for m in ruler.sequence if 0 < m < length]
+    if not inner:
+        return ruler.is_golomb_ruler()
+    index = {m: i for i, m in enumerate(inner)}
+    t = temperature
+
+    step = 0
+    while ruler.collision_count() > 0:
+        step += 1
+        if max_steps is not None and step > max_steps:
+            return False
+        if step % _CLOCK_STEPS == 0 and time.perf_counter() > deadline:
+            return False
+
+        mark = _pick_mark(ruler, inner, rng)
+        to = _destination(ruler, length, rng)
+        delta = ruler.move_cost(mark, to)
+        if delta <= 0 or rng.random() < math.exp(-delta / t):
+            ruler.move_mark(mark, to)
+            i = index.pop(mark)
+            inner[i] = to
+            index[to] = i
+
+        t *= cooling
+        if t < min_temperature:
+            t = temperature
+
+    return True
+
+
+def _tabu(
+    ruler: MutableRuler, length: int, rng: random.Random, deadline: float
+) -> bool:
+    """Tabu search: take the best of a sample of moves, never moving a mark back too soon.
+
+    A move that removes every collision is taken even if it is tabu.
+    """
+    inner = [m for m in ruler.sequence if 0 < m < length]
+    if not inner:
+        return ruler.is_golomb_ruler()
+    index = {m: i for i, m in enumerate(inner)}
+    # Position -> step until which no mark may move there
+    tabu = {}
+    tenure = (max(2, len(inner) // 4), max(3, len(inner)))
+
+    step = 0
+    while ruler.collision_count() > 0:
+        step += 1
+        if step % _CLOCK_STEPS == 0 and time.perf_counter() > deadline:
+            return False
+
+        mark = _pick_mark(ruler, inner, rng)
+        best_move = None
+        for _ in range(_TABU_DESTINATIONS):
+            to = _destination(ruler, length, rng)
+            delta = ruler.move_cost(mark, to)
+            aspiration = ruler.collision_count() + delta == 0
+            if tabu.get(to, 0) > step and not aspiration:
+                continue
+            if best_move is None or delta < best_move[0]:
+                best_move = (delta, to)
+
+        if best_move is None:
+            continue
+        to = best_move[1]
+        ruler.move_mark(mark, to)
+        tabu[mark] = step + rng.randint(*tenure)
+        i = index.pop(mark)
+        inner[i] = to
+        index[to] = i
+
+    return True
+
+
+def _genetic(
+    ruler: MutableRuler, length: int, rng: random.Random, deadline: float
+) -> bool:
+    """Genetic algorithm: cross the rulers of a population over a cut position.
+
+    Each child takes the inner marks of one parent before the cut and of the other one after it,
+    is brought back to the right order, then repaired by a short annealing. It replaces the worst
+    ruler of the population when it has fewer collisions.
+    """
+    marks = ruler.sequence
+    order = len(marks)
+    population = [ruler] + [
+        _fit(marks, length, rng) for _ in range(_POPULATION_SIZE - 1)
+    ]
+    # Diversify the copies of the seed ruler
+    for member in population[1:]:
+        _anneal(member, length, rng, deadline, max_steps=order)
+
+    while True:
+        best = min(population, key=MutableRuler.collision_count)
+        if best.is_golomb_ruler():
+            _assign(ruler, best)
+            return True
+        if time.perf_counter() > deadline:
+            return False
+
+        lhs, rhs = (
+            min(rng.sample(population, 2), key=MutableRuler.collision_count)
+            for _ in range(2)
+        )
+        cut = rng.randrange(1, length)
+        inner = {m for m in lhs.sequence if 0 < m < cut}
+        inner |= {m for m in rhs.sequence if cut <= m < length}
+        child = MutableRuler([0, *inner, length])
+
+        # Too many marks: drop the ones with the most collisions, too few: add the cheapest ones
+        while len(child) > order:
+            child.delete_mark(
+                max(
+                    (m for m in child.sequence if 0 < m < length),
+                    key=child.mark_collisions,
+                )
+            )
+        while len(child) < order:
+            candidates = {_destination(child, length, rng) for _ in range(16)}
+            child.insert_mark(min(candidates, key=child.insert_cost))
+
+        _anneal(child, length, rng, deadline, max_steps=4 * order)
+
+        worst = max(population, key=MutableRuler.collision_count)
+        if child.collision_count() < worst.collision_count():
+            population[population.index(worst)] = child
+
+
+def _assign(ruler: MutableRuler, other: MutableRuler):
+    """Replace the marks of `ruler` with the ones of `other`, which may be `ruler` itself."""
+    if other is ruler:
+        return
+    marks = other.sequence
+    for mark in ruler.sequence:
+        ruler.delete_mark(mark)
+    for mark in marks:
+        ruler.insert_mark(mark)
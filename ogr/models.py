@@ -1,25 +1,48 @@
 """Module that facilities the automatic generation and execution of OGR models using ampl."""
 from __future__ import annotations
 
-from appdirs import user_data_dir
 from collections.abc import Callable
 from enum import Enum
-from os.path import join, exists
-from os import makedirs, remove
-from random import randint
+from math import ceil
+from os import environ, fdopen, remove
+import re
 from shutil import which
+from sys import executable
+from tempfile import mkstemp
 import time
 import subprocess
 
-from .exceptions import AMPLNotFound, NotGolombRuler, SolveError
+from . import bounds
+from .exceptions import (
+    AMPLNotFound,
+    FormulationNotImplemented,
+    NotGolombRuler,
+    SearchTimeout,
+    SolveError,
+)
 from .ruler import GolombRuler
-from .ampl import ogr_integer_lp
+from .ampl import (
+    ogr_constraint_program,
+    ogr_constraint_program_size,
+    ogr_integer_lp,
+    ogr_integer_lp_size,
+    ogr_lp_relaxation_bound,
+    ogr_quadratic_program,
+    ogr_quadratic_program_size,
+    ogr_reduced_lp,
+    ogr_reduced_lp_size,
+    ogr_relaxed_lp,
+)
+from .checkpoint import checkpoint_path, read_checkpoint, write_checkpoint
 from .solvers import AMPLSolver
+from .telemetry import SolveResult, emit, parse_ampl_stats, relative_gap
+from .utils import data_dir, is_golomb_ruler
 
-# First check if ampl exists on this machine
-_AMPL_PATH = which("ampl")
-if _AMPL_PATH is None:
-    raise AMPLNotFound
+# Location of the ampl executable, looked up on the first solve by `ampl_path`
+_AMPL_PATH = None
+
+# Time given to a solver to stop on its own after its time limit before it is killed
+_KILL_GRACE_S = 5
 
 if __name__ == "__main__":
     full_path = which("ampl")
@@ -33,11 +56,50 @@ class Formulations(Enum):
     IntegerLinearProgramRelaxation = 2
     ConstraintProgram = 3
     QuadraticProgram = 4
+    BranchAndBound = 5
+    ReducedIntegerLinearProgram = 6
 
-    def callback(self) -> Callable[[int, int, AMPLSolver], str]:
+    def callback(self) -> Callable[[int, int, AMPLSolver, int], str]:
         """Return the function that generates the AMPL source code implementing this formulation."""
         if self == Formulations.IntegerLinearProgram:
             return ogr_integer_lp
+        elif self == Formulations.ReducedIntegerLinearProgram:
+            return ogr_reduced_lp
+        elif self == Formulations.IntegerLinearProgramRelaxation:
+            return ogr_relaxed_lp
+        elif self == Formulations.ConstraintProgram:
+            return ogr_constraint_program
+        elif self == Formulations.QuadraticProgram:
+            return ogr_quadratic_program
+
+        raise FormulationNotImplemented(f"{self.name} does not build an AMPL model")
+
+    def model_size(self, order: int, upper_bound: int) -> tuple[int, int] | None:
+        """Return the number of variables and constraints of the AMPL model, if it has one."""
+        if self == Formulations.IntegerLinearProgram:
+            return ogr_integer_lp_size(order, upper_bound)
+        elif self in (
+            Formulations.ReducedIntegerLinearProgram,
+            Formulations.IntegerLinearProgramRelaxation,
+        ):
+            return ogr_reduced_lp_size(order, upper_bound)
+        elif self == Formulations.ConstraintProgram:
+            return ogr_constraint_program_size(order, upper_bound)
+        elif self == Formulations.QuadraticProgram:
+            return ogr_quadratic_program_size(order, upper_bound)
+
+    def default_solver(self) -> AMPLSolver:
+        """Return the solver used for this formulation when none is requested."""
+        if self == Formulations.ConstraintProgram:
+            return AMPLSolver.GECODE
+        return AMPLSolver.CPLEX
+
+    def supports(self, solver: AMPLSolver) -> bool:
+        """Whether `solver` handles every constraint of the AMPL model of this formulation."""
+        # `alldiff` is only understood by constraint programming solvers
+        if self == Formulations.ConstraintProgram:
+            return solver == AMPLSolver.GECODE
+        return True
 
     def from_str(input: str) -> Formulations:
         """Raises `ValueError` on bad input."""
@@ -50,10 +112,45 @@ class Formulations(Enum):
             return Formulations.ConstraintProgram
         elif input == "qp":
             return Formulations.QuadraticProgram
+        elif input == "bnb":
+            return Formulations.BranchAndBound
+        elif input == "rilp":
+            return Formulations.ReducedIntegerLinearProgram
+        else:
+            raise ValueError
+
+
+class AMPLBackend(Enum):
+    """How `solve` talks to AMPL."""
+
+    # A new ampl process per solve, reading a generated script
+    Subprocess = 1
+    # A long-lived interpreter per process with `ogr/ampl/ogr.mod` loaded once, requires amplpy
+    Session = 2
+
+    def from_str(input: str) -> AMPLBackend:
+        """Raises `ValueError` on bad input."""
+        input = input.lower()
+        if input == "subprocess":
+            return AMPLBackend.Subprocess
+        elif input == "session":
+            return AMPLBackend.Session
         else:
             raise ValueError
 
 
+def _default_bounds(
+    order: int, upper_bound: int = None, lower_bound: int = None
+) -> tuple[int, int]:
+    """Fill in the bounds that the caller didn't specify with the ones of `ogr.bounds`."""
+    if upper_bound is None:
+        upper_bound = bounds.upper_bound(order)
+    if lower_bound is None:
+        lower_bound = min(bounds.lower_bound(order), upper_bound)
+
+    return upper_bound, lower_bound
+
+
 def solve(
     order: int,
     upper_bound: int = None,
@@ -61,40 +158,474 @@ def solve(
     solver: AMPLSolver = AMPLSolver.CPLEX,
     timeout_s: float = 60,
     verbose=False,
+    use_cache=True,
+    lower_bound: int = None,
+    backend: AMPLBackend = AMPLBackend.Subprocess,
+    resume=False,
+    checkpoint_interval_s: float = None,
+    warm_start=True,
+    incumbent: list[int] = None,
 ) -> GolombRuler:
-    """Attempt to solve an instance of the OGR with `order` marks and"""
-    if upper_bound is None:
-        upper_bound = 2 ** (order - 1) - 1
+    """Attempt to solve an instance of the OGR with `order` marks and
+
+    `upper_bound` and `lower_bound` default to the tightest cheap bounds from `ogr.bounds`.
+
+    The ruler found is checkpointed in the user data dir, under the order, bounds, formulation and
+    solver. With `resume`, the solve starts from the checkpointed ruler, or returns it if it was
+    proven optimal. With `checkpoint_interval_s` and the subprocess backend, the solver is restarted
+    from its best ruler at that interval, checkpointing it each time, see `_solve_in_slices`.
+
+    The solver starts from `incumbent`, or with `warm_start` from the shortest ruler of
+    `bounds.heuristic_ruler`: its marks are the initial values of the model, and the solver only
+    looks for strictly shorter rulers. The incumbent is returned as solved when there is none.
+    Incumbents longer than `upper_bound` are ignored.
+    """
+    return solve_detailed(
+        order,
+        upper_bound,
+        formulation,
+        solver,
+        timeout_s,
+        verbose,
+        use_cache,
+        lower_bound,
+        backend,
+        resume,
+        checkpoint_interval_s,
+        warm_start,
+        incumbent,
+    ).ruler
+
+
+def solve_detailed(
+    order: int,
+    upper_bound: int = None,
+    formulation=Formulations.IntegerLinearProgram,
+    solver: AMPLSolver = AMPLSolver.CPLEX,
+    timeout_s: float = 60,
+    verbose=False,
+    use_cache=True,
+    lower_bound: int = None,
+    backend: AMPLBackend = AMPLBackend.Subprocess,
+    resume=False,
+    checkpoint_interval_s: float = None,
+    warm_start=True,
+    incumbent: list[int] = None,
+) -> SolveResult:
+    """Like `solve`, but return a `SolveResult` with the timings and statistics of the solve.
+
+    The result is also handed to the hooks of `ogr.telemetry`.
+    """
+    start = time.perf_counter()
+    if formulation == Formulations.BranchAndBound:
+        # Solved in-process, no AMPL required.
+        return _solve_branch_and_bound(
+            order, upper_bound, lower_bound, solver, timeout_s, use_cache, start
+        )
+
+    _check_solver(formulation, solver)
+
+    if incumbent is not None:
+        incumbent = sorted(incumbent)
+        incumbent = [m - incumbent[0] for m in incumbent]
+        if len(incumbent) != order or not is_golomb_ruler(incumbent):
+            raise ValueError(f"The incumbent {incumbent} isn't a golomb ruler with {order} marks")
+    if warm_start:
+        incumbent = _shortest(incumbent, list(bounds.heuristic_ruler(order)))
+
+    upper_bound, lower_bound = _default_bounds(order, upper_bound, lower_bound)
+    result = SolveResult(
+        GolombRuler([0]),
+        order,
+        formulation.name,
+        solver.name,
+        backend.name,
+        upper_bound,
+        lower_bound,
+    )
 
     if verbose:
         print(f"============> OGR Solve ================>")
         print(f"=> order:       {order}")
+        print(f"=> bounds:      [{lower_bound}, {upper_bound}]")
         print(f"=> formulation: {formulation.name}")
         print(f"=> solver:      {solver.name}")
+        size = formulation.model_size(order, upper_bound)
+        if size is not None:
+            print(f"=> variables:   {size[0]}")
+            print(f"=> constraints: {size[1]}")
         # print(f"=> timeout:     {int(timeout_s)}s")
 
     # Build the temporary source code for an AMPL script
     ampl_source_code_callback = formulation.callback()
-    source_code = ampl_source_code_callback(order, upper_bound, solver)
+    source_code = ampl_source_code_callback(order, upper_bound, solver, lower_bound)
+    result.generation_time_s = time.perf_counter() - start
+
+    # Reuse the ruler of a previous solve of this exact instance
+    instance = (order, upper_bound, formulation.name, solver.name, source_code)
+    cache = None
+    if use_cache:
+        from .cache import ResultCache
+
+        cache = ResultCache()
+    if cache is not None:
+        ruler = cache.get(*instance)
+        if ruler is not None:
+            if verbose:
+                print("=> cached")
+            result.ruler, result.status, result.cached = ruler, "solved", True
+            result.wall_time_s = time.perf_counter() - start
+            return _emit(result)
+
+    checkpoint = checkpoint_path(
+        f"solve_{order}_{lower_bound}_{upper_bound}_{formulation.name}_{solver.name}"
+    )
+    resumed = _read_incumbent(checkpoint, order) if resume else None
+    if resumed is not None:
+        marks, status = resumed
+        if verbose:
+            print(f"=> resumed:     length {marks[-1]} ({status})")
+        if status == "solved":
+            result.ruler, result.status = GolombRuler(marks), status
+            result.wall_time_s = time.perf_counter() - start
+            return _emit(result)
+        incumbent = _shortest(incumbent, marks)
+
+    if incumbent is not None and incumbent[-1] > upper_bound:
+        incumbent = None
+    if verbose and incumbent is not None:
+        print(f"=> incumbent:   length {incumbent[-1]}")
+
+    solve_start = time.perf_counter()
+    if backend == AMPLBackend.Session:
+        if formulation != Formulations.IntegerLinearProgram:
+            raise FormulationNotImplemented(
+                f"{formulation.name} is not available in AMPL sessions"
+            )
+
+        # Like `_solve_in_slices`, the incumbent bounds the length and is kept if nothing is shorter
+        if incumbent is not None:
+            upper_bound = min(upper_bound, incumbent[-1])
+            lower_bound = min(lower_bound, upper_bound)
+
+        from .ampl.session import get_session
+
+        session = get_session()
+        ruler = session.solve(
+            order, upper_bound, lower_bound, solver, timeout_s, incumbent
+        )
+        status = session.last_solve_result
+        stats = session.last_stats
+        if incumbent is not None and (
+            ruler.order() != order or ruler.length() > incumbent[-1]
+        ):
+            ruler = GolombRuler(incumbent)
+            if status == "infeasible" and solver.cutoff_option() is not None:
+                status = "solved"
+    else:
+        ruler, status, stats = _solve_in_slices(
+            order,
+            upper_bound,
+            lower_bound,
+            formulation,
+            solver,
+            timeout_s,
+            checkpoint_interval_s,
+            incumbent,
+            checkpoint,
+            verbose,
+        )
+    end = time.perf_counter()
+
+    if ruler.order() == order:
+        _write_incumbent(checkpoint, ruler, status)
+
+    result.ruler, result.status = ruler, status
+    result.wall_time_s = end - start
+    _fill_stats(result, stats, end - solve_start)
+
+    if verbose and result.solver_time_s is not None:
+        print(f"=> solver time: {result.solver_time_s:.3f}s")
+
+    if cache is not None and status == "solved" and ruler.order() == order:
+        cache.put(*instance, ruler, end - solve_start, status)
+
+    return _emit(result)
+
+
+def _check_solver(formulation: Formulations, solver: AMPLSolver):
+    """Raise `FormulationNotImplemented` before running a solver that can't handle `formulation`."""
+    if not formulation.supports(solver):
+        raise FormulationNotImplemented(
+            f"{formulation.name} can't be solved by {solver.name}, "
+            f"use {formulation.default_solver().name}"
+        )
+
+
+def _solve_branch_and_bound(
+    order: int,
+    upper_bound: int,
+    lower_bound: int,
+    solver: AMPLSolver,
+    timeout_s: float,
+    use_cache: bool,
+    start: float,
+) -> SolveResult:
+    """Solve with `search.solve_exact`, the status is "limit" when it runs out of time."""
+    from .cache import ResultCache
+    from .search import solve_exact
+
+    result = SolveResult(
+        GolombRuler([0]),
+        order,
+        Formulations.BranchAndBound.name,
+        solver.name,
+        "InProcess",
+        upper_bound,
+        lower_bound,
+    )
+
+    # There is no source code, the call stands for it in the cache, and -1 for a missing bound
+    call = f"solve_exact({order}, {upper_bound}, {lower_bound})"
+    key_bound = -1 if upper_bound is None else upper_bound
+    instance = (order, key_bound, result.formulation, solver.name, call)
+    cache = ResultCache() if use_cache else None
+    ruler = cache.get(*instance) if cache is not None else None
+    if ruler is not None:
+        result.ruler, result.status, result.cached = ruler, "solved", True
+    else:
+        try:
+            result.ruler = solve_exact(order, upper_bound, lower_bound, timeout_s)
+            result.status = "solved"
+        except SearchTimeout:
+            result.status = "limit"
+        result.solver_time_s = time.perf_counter() - start
+        if cache is not None and result.status == "solved":
+            cache.put(*instance, result.ruler, result.solver_time_s, result.status)
+
+    result.wall_time_s = time.perf_counter() - start
+    return _emit(result)
+
+
+def _solve_in_slices(
+    order: int,
+    upper_bound: int,
+    lower_bound: int,
+    formulation: Formulations,
+    solver: AMPLSolver,
+    timeout_s: float,
+    checkpoint_interval_s: float,
+    incumbent: list[int],
+    checkpoint: str,
+    verbose=False,
+) -> tuple[GolombRuler, str, dict]:
+    """Run ampl processes of at most `checkpoint_interval_s` until `timeout_s` is spent.
+
+    Every process starts from the best ruler known, `incumbent` at first: its length becomes the
+    upper bound, its marks the initial values of the solver, and the solver is asked to cut off the
+    rulers that aren't strictly shorter. If it proves there are none, the best ruler is returned as
+    "solved" rather than the "infeasible" of the solver. After each
+    process stopped by its time limit, the best ruler is checkpointed and another one is started;
+    any other `solve_result` ends the solve. Without `checkpoint_interval_s` a single process is
+    run. Return the best ruler, the `solve_result` of the last process and its statistics.
+
+    Each process builds its search tree from scratch, so optimality is only proven by a process
+    that completes within its slice. A slice that doesn't shorten the best ruler is followed by one
+    twice as long, so that without `timeout_s` the solve eventually ends.
+    """
+    deadline = None if timeout_s is None else time.perf_counter() + timeout_s
+    best = GolombRuler(incumbent) if incumbent is not None else GolombRuler([0])
+    status, stats = "failure", {}
+    interval_s = checkpoint_interval_s
+
+    while True:
+        if best.order() == order:
+            upper_bound = min(upper_bound, best.length())
+            lower_bound = min(lower_bound, upper_bound)
+
+        slice_s = None if deadline is None else max(0, deadline - time.perf_counter())
+        if interval_s is not None:
+            slice_s = interval_s if slice_s is None else min(slice_s, interval_s)
+
+        warm_start = best.sequence if best.order() == order else None
+        source_code = formulation.callback()(
+            order, upper_bound, solver, lower_bound, warm_start
+        )
+        cutoff = None
+        if best.order() == order and solver.cutoff_option() is not None:
+            cutoff = best.length() - 1
+        try:
+            output = _run_ampl(source_code, solver, slice_s, cutoff)
+        except subprocess.TimeoutExpired:
+            # The solver ignored its time limit, keep what the previous slices found
+            if best.order() == order:
+                return best, "limit", stats
+            raise
+
+        ruler, status = _parse_output(output, order, upper_bound, source_code)
+        stats = parse_ampl_stats(output)
+        if status == "infeasible" and cutoff is not None:
+            # Nothing is shorter than the best ruler, which is then optimal
+            status = "solved"
+        shorter = ruler.order() == order and (
+            best.order() != order or ruler.length() < best.length()
+        )
+        if ruler.order() == order and (best.order() != order or ruler.length() <= best.length()):
+            best = ruler
+
+        out_of_time = deadline is not None and time.perf_counter() >= deadline
+        if status != "limit" or interval_s is None or out_of_time:
+            return best, status, stats
+        if not shorter:
+            interval_s *= 2
+
+        if best.order() == order:
+            _write_incumbent(checkpoint, best, status)
+            if verbose:
+                print(f"=> checkpoint:  length {best.length()} ({status})")
+
+
+def _read_incumbent(path: str, order: int) -> tuple[list[int], str] | None:
+    """Return the marks and status of the ruler checkpointed at `path`, if it has `order` marks."""
+    state = read_checkpoint(path)
+    if state is None or len(state.get("marks", [])) != order:
+        return None
+    return state["marks"], state["status"]
+
+
+def _shortest(marks: list[int] | None, other: list[int]) -> list[int]:
+    """Return the shorter of the rulers `marks` and `other`, `other` if `marks` is None."""
+    if marks is None or other[-1] < marks[-1]:
+        return other
+    return marks
+
 
-    # Store the file in a temporary location
-    data_dir = user_data_dir("ogr", "ejovo")
-    if not exists(data_dir):
-        makedirs(data_dir)
+def _write_incumbent(path: str, ruler: GolombRuler, status: str):
+    write_checkpoint(path, dict(marks=ruler.sequence, status=status, time=time.time()))
 
-    tmp_file = join(data_dir, f"tmp_{randint(1, 99999):08}.ampl")
-    with open(tmp_file, "w") as file:
-        file.write(source_code)
 
-    # Now actually run our model
-    arguments = [_AMPL_PATH, tmp_file]
-    start = time.time()
-    output = subprocess.run(arguments, capture_output=True, timeout=timeout_s)
-    solved = output.stdout.decode()
-    end = time.time()
+def _fill_stats(result: SolveResult, stats: dict, elapsed_s: float):
+    """Copy the statistics reported by AMPL to `result`, given the wall time of the ampl call."""
+    result.solver_time_s = stats.get("solver_time_s")
+    result.nodes = stats.get("nodes")
+    result.iterations = stats.get("iterations")
+    result.variables = stats.get("variables")
+    result.constraints = stats.get("constraints")
+    result.gap = relative_gap(stats.get("objective"), stats.get("best_bound"))
+    if "ampl_time_s" in stats:
+        result.spawn_time_s = max(0.0, elapsed_s - stats["ampl_time_s"])
+
+
+def _emit(result: SolveResult) -> SolveResult:
+    """Hand `result` to the telemetry hooks and return it."""
+    emit(result)
+    return result
+
+
+def relaxation_lower_bound(
+    order: int,
+    upper_bound: int = None,
+    solver: AMPLSolver = AMPLSolver.CPLEX,
+    timeout_s: float = 60,
+) -> int:
+    """Return a lower bound on the length of a ruler with `order` marks from the linear relaxation.
+
+    Never weaker than `ogr.bounds.lower_bound`. Raises `SolveError` if the relaxation isn't solved.
+    """
+    upper_bound, lower_bound = _default_bounds(order, upper_bound)
+    source_code = ogr_lp_relaxation_bound(order, upper_bound, solver, lower_bound)
+    output = _run_ampl(source_code, solver, timeout_s)
+
+    match = re.search(r"^total_length = (\S+)", output, re.MULTILINE)
+    if match is None:
+        raise SolveError(
+            f"The relaxation of order {order} and upper_bound {upper_bound} was not solved. AMPL output: {output}"
+        )
+
+    # Solvers report values like 33.99999999 for integral optima
+    return max(lower_bound, ceil(float(match.group(1)) - 1e-6))
+
+
+def ampl_path() -> str:
+    """Return the location of the ampl executable.
+
+    It is looked up on the first call rather than on import, so that the package can be imported on
+    machines without AMPL. Only the formulations solved by AMPL need it. Raises `AMPLNotFound`.
+    """
+    global _AMPL_PATH
+    if _AMPL_PATH is None:
+        _AMPL_PATH = which("ampl")
+        if _AMPL_PATH is None:
+            raise AMPLNotFound
+    return _AMPL_PATH
+
+
+def _run_ampl(
+    source_code: str, solver: AMPLSolver, timeout_s: float, cutoff: int = None
+) -> str:
+    """Run `source_code` in a new ampl process and return its output."""
+    ampl = ampl_path()
+
+    # Store the file in a temporary location, unique even with concurrent solves
+    fd, tmp_file = mkstemp(prefix="tmp_", suffix=".ampl", dir=data_dir())
+    try:
+        with fdopen(fd, "w") as file:
+            file.write(source_code)
+
+        # Now actually run our model
+        arguments = [ampl, tmp_file]
+        output = subprocess.run(
+            arguments,
+            capture_output=True,
+            timeout=_kill_timeout(timeout_s),
+            env=_solver_env(solver, timeout_s, cutoff),
+        )
+    finally:
+        remove(tmp_file)
+
+    return output.stdout.decode()
+
+
+def _solver_env(
+    solver: AMPLSolver, timeout_s: float, cutoff: int = None
+) -> dict[str, str]:
+    """Return the environment of an ampl process, asking the solver to stop after `timeout_s`.
+
+    AMPL solvers read their options from the `<solver>_options` environment variable. Passing the
+    time limit there keeps it out of the source code, so it doesn't change the cache key. The solver
+    is also asked to report its best bound, from which `SolveResult.gap` is computed, and to prune
+    the nodes whose objective can't be below `cutoff`, when it has options for them.
+    """
+    env = dict(environ)
+    name = f"{solver.ampl_name()}_options"
+    options = env.get(name, "")
+    if solver.bound_option() is not None:
+        options += f" {solver.bound_option()}"
+    if timeout_s is not None:
+        options += f" timelimit={timeout_s}"
+    if cutoff is not None and solver.cutoff_option() is not None:
+        options += f" {solver.cutoff_option()}={cutoff}"
+    env[name] = options.strip()
+    return env
+
+
+def _kill_timeout(timeout_s: float) -> float | None:
+    """Return how long to wait before killing an ampl process that ignores its time limit."""
+    return None if timeout_s is None else timeout_s + _KILL_GRACE_S
+
+
+def _parse_output(
+    solved: str, order: int, upper_bound: int, source_code: str
+) -> tuple[GolombRuler, str]:
+    """Turn the output of an AMPL script into a GolombRuler and the value of `solve_result`.
+
+    The ruler is `GolombRuler([0])` when the output has no distances.
+    """
+    match = re.search(r"^solve_result = (\w+)", solved, re.MULTILINE)
+    status = match.group(1) if match is not None else "failure"
 
     # Now let's process the output and turn the distances into a GolombRuler.
-    # Find the line that has "d :="   lines = solved.split("\n")
+    # Find the line that has "d :="
     try:
         lines = solved.split("\n")
         index = lines.index("d :=")
@@ -105,17 +636,171 @@ def solve(
 
         ruler = GolombRuler.from_distances(distances, order)
 
-    except NotGolombRuler as ngr:
+    except NotGolombRuler:
         raise SolveError(
             f"Error when processing problem with order {order} and upper_bound: {upper_bound}. AMPL output: {solved} AMPL source code: {source_code}"
         )
 
-    except:
-        # raise SolveError(solved)
-        remove(tmp_file)
-        return GolombRuler([0])
+    except Exception:
+        return GolombRuler([0]), status
+
+    return ruler, status
+
 
-    # Remove the tmp file
-    remove(tmp_file)
+# ---------------------------------------------------------------------------- #
+#                                  Async solves                                #
+# ---------------------------------------------------------------------------- #
 
+
+async def solve_async(
+    order: int,
+    upper_bound: int = None,
+    formulation=Formulations.IntegerLinearProgram,
+    solver: AMPLSolver = AMPLSolver.CPLEX,
+    timeout_s: float = 60,
+    lower_bound: int = None,
+) -> GolombRuler:
+    """Solve an instance of the OGR without blocking the event loop.
+
+    Cancelling the task kills the solver process. When the solver runs out of time, the best ruler
+    it found so far is returned, or `GolombRuler([0])` if it found none.
+    """
+    ruler, _ = await _solve_async(
+        order, upper_bound, formulation, solver, timeout_s, lower_bound
+    )
     return ruler
+
+
+async def race(
+    order: int,
+    candidates: list[tuple[Formulations, AMPLSolver]],
+    upper_bound: int = None,
+    timeout_s: float = 60,
+) -> tuple[GolombRuler, Formulations, AMPLSolver]:
+    """Solve `order` with every (formulation, solver) of `candidates` at the same time.
+
+    Return the first proven optimum along with the formulation and solver that found it, killing
+    every other solve. If none of them proves optimality, return the shortest ruler found.
+
+    Raises the exception of the first candidate that failed if they all did, or else `SolveError`
+    when no candidate found a ruler, caused by the first exception raised if any.
+    """
+    import asyncio
+
+    tasks = {
+        asyncio.create_task(
+            _solve_async(order, upper_bound, formulation, solver, timeout_s)
+        ): (formulation, solver)
+        for formulation, solver in candidates
+    }
+    pending = set(tasks)
+    best = None
+    errors = []
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is not None:
+                    errors.append(task.exception())
+                    continue
+
+                ruler, status = task.result()
+                if ruler.order() != order:
+                    continue
+                if status == "solved":
+                    return ruler, *tasks[task]
+                if best is None or ruler.length() < best[0].length():
+                    best = (ruler, *tasks[task])
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    if best is None:
+        if errors and len(errors) == len(tasks):
+            raise errors[0]
+        raise SolveError(f"No candidate found a ruler with order {order}") from (
+            errors[0] if errors else None
+        )
+
+    return best
+
+
+async def _solve_async(
+    order: int,
+    upper_bound: int,
+    formulation: Formulations,
+    solver: AMPLSolver,
+    timeout_s: float,
+    lower_bound: int = None,
+) -> tuple[GolombRuler, str]:
+    """Solve an instance in a child process, returning the ruler and the solve_result."""
+    if formulation == Formulations.BranchAndBound:
+        # Run the search in a child python so that it can be killed like the solvers.
+        code = (
+            "from ogr.search import solve_exact; "
+            f"print(*solve_exact({order}, {upper_bound}, {lower_bound}).sequence)"
+        )
+        output = await _communicate([executable, "-c", code], timeout_s, environ)
+        if output is None:
+            return GolombRuler([0]), "limit"
+        try:
+            return GolombRuler([int(m) for m in output.split()]), "solved"
+        except (NotGolombRuler, ValueError):
+            return GolombRuler([0]), "failure"
+
+    _check_solver(formulation, solver)
+
+    ampl = ampl_path()
+
+    upper_bound, lower_bound = _default_bounds(order, upper_bound, lower_bound)
+    source_code = formulation.callback()(order, upper_bound, solver, lower_bound)
+
+    fd, tmp_file = mkstemp(prefix="tmp_", suffix=".ampl", dir=data_dir())
+    try:
+        with fdopen(fd, "w") as file:
+            file.write(source_code)
+
+        output = await _communicate(
+            [ampl, tmp_file],
+            _kill_timeout(timeout_s),
+            _solver_env(solver, timeout_s),
+        )
+    finally:
+        remove(tmp_file)
+
+    if output is None:
+        return GolombRuler([0]), "limit"
+
+    return _parse_output(output, order, upper_bound, source_code)
+
+
+async def _communicate(
+    arguments: list[str], timeout_s: float, env: dict[str, str]
+) -> str | None:
+    """Run a process and return its stdout, or `None` if it was killed after `timeout_s`.
+
+    The process is killed as well when the calling task is cancelled.
+    """
+    # Imported here since it is slow to import and only needed inside an event loop
+    import asyncio
+
+    process = await asyncio.create_subprocess_exec(
+        *arguments,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=env,
+    )
+    try:
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout_s)
+    except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+        process.kill()
+        await process.wait()
+        if isinstance(e, asyncio.CancelledError):
+            raise
+        return None
+
+    return stdout.decode()
@@ -0,0 +1,190 @@
+"""Definition of the `MutableRuler` class."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from .exceptions import NotGolombRuler
+from .ruler import GolombRuler
+
+
+class MutableRuler:
+    """A set of marks edited in place, which may break the golomb property along the way.
+
+    The number of pairs of marks at each distance is counted, so that inserting, deleting or
+    moving a mark updates the distances and the collision count in O(n) instead of validating the
+    whole ruler again. A collision is a pair of marks whose distance is also the distance of an
+    earlier pair: the ruler is golomb when there are none.
+    """
+
+    __slots__ = ("_marks", "_counts", "_collisions")
+
+    def __init__(self, marks: Iterable[int] = ()):
+        """Construct a new MutableRuler containing `marks`, which don't have to form a golomb ruler.
+
+        Raises `ValueError` if a mark is negative or repeated.
+        """
+        self._marks: set[int] = set()
+        # Distance -> number of pairs of marks at that distance
+        self._counts: dict[int, int] = {}
+        self._collisions = 0
+
+        for mark in marks:
+            self.insert_mark(mark)
+
+    def __len__(self) -> int:
+        return len(self._marks)
+
+    def __contains__(self, mark: int) -> bool:
+        return mark in self._marks
+
+    def __repr__(self) -> str:
+        return f"MutableRuler({self.sequence})"
+
+    @property
+    def sequence(self) -> list[int]:
+        """The marks of this ruler in increasing order, as a new list."""
+        return sorted(self._marks)
+
+    def order(self) -> int:
+        return len(self._marks)
+
+    def length(self) -> int:
+        """Return the distance between the first and last marks, 0 without marks."""
+        if len(self._marks) < 2:
+            return 0
+        return max(self._marks) - min(self._marks)
+
+    def collision_count(self) -> int:
+        """Return the number of pairs of marks whose distance repeats the one of another pair."""
+        return self._collisions
+
+    def is_golomb_ruler(self) -> bool:
+        return self._collisions == 0
+
+    def distance_count(self, distance: int) -> int:
+        """Return the number of pairs of marks at `distance`."""
+        return self._counts.get(distance, 0)
+
+    def mark_collisions(self, mark: int) -> int:
+        """Return the number of pairs of `mark` whose distance is shared with another pair."""
+        counts = self._counts
+        return sum(
+            1
+            for other in self._marks
+            if other != mark and counts[abs(mark - other)] > 1
+        )
+
+    def colliding_pairs(self) -> dict[int, list[tuple[int, int]]]:
+        """Return the pairs of marks, by distance, of every distance shared by several pairs."""
+        marks = self.sequence
+        pairs = {}
+        for i, lhs in enumerate(marks):
+            for rhs in marks[i + 1 :]:
+                if self._counts[rhs - lhs] > 1:
+                    pairs.setdefault(rhs - lhs, []).append((lhs, rhs))
+        return pairs
+
+    # ---------------------------------------------------------------------------- #
+    #                                     Edits                                    #
+    # ---------------------------------------------------------------------------- #
+    def insert_mark(self, mark: int) -> list[tuple[int, int]]:
+        """Add `mark` and return its pairs whose distance was already taken.
+
+        Raises `ValueError` if `mark` is negative or already a mark.
+        """
+        if mark < 0 or mark in self._marks:
+            raise ValueError(f"Can't insert mark {mark} in {self!r}")
+
+        collisions = []
+        counts = self._counts
+        for other in self._marks:
+            distance = abs(mark - other)
+            count = counts.get(distance, 0)
+            if count > 0:
+                collisions.append((min(mark, other), max(mark, other)))
+            counts[distance] = count + 1
+
+        self._collisions += len(collisions)
+        self._marks.add(mark)
+        return collisions
+
+    def delete_mark(self, mark: int):
+        """Remove `mark`, freeing the distances of its pairs.
+
+        Raises `KeyError` if `mark` is not a mark.
+        """
+        self._marks.remove(mark)
+
+        counts = self._counts
+        for other in self._marks:
+            distance = abs(mark - other)
+            count = counts[distance] - 1
+            if count > 0:
+                self._collisions -= 1
+                counts[distance] = count
+            else:
+                del counts[distance]
+
+    def move_mark(self, mark: int, to: int) -> list[tuple[int, int]]:
+        """Move `mark` to `to` and return the pairs of the moved mark whose distance was taken."""
+        if to != mark and (to < 0 or to in self._marks):
+            raise ValueError(f"Can't move mark {mark} to {to} in {self!r}")
+        self.delete_mark(mark)
+        return self.insert_mark(to)
+
+    def insert_cost(self, mark: int) -> int:
+        """Return the number of collisions that inserting `mark` would add, without inserting it."""
+        if mark < 0 or mark in self._marks:
+            raise ValueError(f"Can't insert mark {mark} in {self!r}")
+
+        counts = self._counts
+        seen = set()
+        cost = 0
+        for other in self._marks:
+            distance = abs(mark - other)
+            # Two new pairs at the same distance collide with each other as well
+            if counts.get(distance, 0) > 0 or distance in seen:
+                cost += 1
+            seen.add(distance)
+        return cost
+
+    def move_cost(self, mark: int, to: int) -> int:
+        """Return the change of `collision_count` that moving `mark` to `to` would cause."""
+        if to == mark:
+            return 0
+        if mark not in self._marks:
+            raise KeyError(mark)
+        if to < 0 or to in self._marks:
+            raise ValueError(f"Can't move mark {mark} to {to} in {self!r}")
+
+        counts = self._counts
+        # Pairs of `mark` that currently repeat a distance: removing them frees one collision each
+        freed = {}
+        for other in self._marks:
+            if other != mark:
+                distance = abs(mark - other)
+                freed[distance] = freed.get(distance, 0) + 1
+        removed = sum(min(n, counts[distance] - 1) for distance, n in freed.items())
+
+        added = 0
+        new = {}
+        for other in self._marks:
+            if other != mark:
+                distance = abs(to - other)
+                remaining = counts.get(distance, 0) - freed.get(distance, 0)
+                if remaining + new.get(distance, 0) > 0:
+                    added += 1
+                new[distance] = new.get(distance, 0) + 1
+        return added - removed
+
+    def to_ruler(self) -> GolombRuler:
+        """Return the `GolombRuler` with these marks.
+
+        Raises `NotGolombRuler` if some pairs collide.
+        """
+        if self._collisions > 0:
+            raise NotGolombRuler(
+                f"{self!r} has {self._collisions} colliding pairs: {self.colliding_pairs()}"
+            )
+        return GolombRuler(self.sequence, assert_golomb_property=False)
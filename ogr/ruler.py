@@ -2,13 +2,29 @@
 
 from __future__ import annotations
 
+from array import array
+from typing import TYPE_CHECKING
+
+from .differences import DifferenceSet
 from .exceptions import NotGolombRuler
 from .generation import generate_golomb_ruler_improved, generate_golomb_ruler_naive
 from .utils import dist, half, is_golomb_ruler
 
+if TYPE_CHECKING:
+    from .mutable import MutableRuler
+
 
 class GolombRuler:
-    """A list of non-negative integers such that each pairwise difference is distinct."""
+    """A list of non-negative integers such that each pairwise difference is distinct.
+
+    Rulers are immutable. The marks are stored in a compact `array` (or in the caller's buffer, see
+    `GolombRuler.from_buffer`) and the length and distances are computed once, on first access.
+    """
+
+    __slots__ = ("_marks", "_length", "_triu", "_sorted")
+
+    # Type code of the marks. 64 bits because the naive rulers outgrow 32 bits at order 33.
+    TYPECODE = "q"
 
     def __init__(self, sequence: list[int], assert_golomb_property=True):
         """Construct a new GolombRuler.
@@ -18,22 +34,46 @@ class GolombRuler:
         if assert_golomb_property:
             if not is_golomb_ruler(sequence):
                 raise NotGolombRuler(
-                    f"Input sequence: {sequence} does not satisfy the GolombRuler conditions."
+                    f"Input sequence: {list(sequence)} does not satisfy the GolombRuler conditions."
                 )
 
-        self.sequence = sequence
+        self._marks = array(self.TYPECODE, sequence)
+        self._length = None
+        self._triu = None
+        self._sorted = None
 
     def __str__(self) -> str:
         s = "GolombRuler {\n"
         s += f"  order:\t{self.order()}\n"
         s += f"  sequence:\t{self.sequence}\n"
-        s += f"  distances triu:  \t{self.triu_distances()}\n"
-        s += f"  distances sorted:\t{sorted(self.triu_distances())}\n"
+        s += f"  distances triu:  \t{self.triu_distances().tolist()}\n"
+        s += f"  distances sorted:\t{self.sorted_distances().tolist()}\n"
         s += f"  length:\t{self.length()}\n"
         s += "}"
 
         return s
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GolombRuler):
+            return NotImplemented
+        return self._marks == other._marks
+
+    def __hash__(self) -> int:
+        return hash(tuple(self._marks))
+
+    def __reduce__(self):
+        return (GolombRuler, (self.sequence, False))
+
+    @property
+    def sequence(self) -> list[int]:
+        """The marks of this ruler, as a new list."""
+        return self._marks.tolist()
+
+    @property
+    def marks(self) -> memoryview:
+        """A read-only view of the marks of this ruler, without copying them."""
+        return memoryview(self._marks).toreadonly()
+
     def order(self) -> int:
         """Return the order (number of elements in the sequence) of this GolombRuler.
 
@@ -41,11 +81,23 @@ class GolombRuler:
         Examples:
         """
 
-        return len(self.sequence)
+        return len(self._marks)
 
     def length(self) -> int:
         """The largest distance of our GolombRuler. To return the number of elements, see `GolombRuler.order`."""
-        return max(self.sequence)
+        if self._length is None:
+            self._length = max(self._marks)
+        return self._length
+
+    def difference_set(self) -> DifferenceSet:
+        """Return a `DifferenceSet` holding the marks of this ruler, used to insert marks incrementally."""
+        return DifferenceSet(self._marks)
+
+    def mutable(self) -> MutableRuler:
+        """Return a `MutableRuler` holding the marks of this ruler, to edit them one at a time."""
+        from .mutable import MutableRuler
+
+        return MutableRuler(self._marks)
 
     def d_plus_e(self) -> str:
         """Return a string representation of the d plus e model."""
@@ -81,17 +133,33 @@ class GolombRuler:
         """Compute the linear index for a upper triangular coordinate."""
         return self.triu_elements_before_row(row_index) + col_index
 
-    def triu_distances(self) -> list[int]:
-        """Compute the distances between every mark of this ruler, storing the results in a 1-d list."""
-        distances: list[int] = [0 for _ in range(self.triu_size())]
-        idx = 0
+    def triu_distances(self) -> memoryview:
+        """Compute the distances between every mark of this ruler once, returning a read-only view of them."""
+        if self._triu is None:
+            distances = array(self.TYPECODE, bytes(8 * self.triu_size()))
+            idx = 0
+
+            sequence = self._marks
+            n = len(sequence)
+
+            for lhs_idx in range(n):
+                lhs = sequence[lhs_idx]
+                for rhs_idx in range(lhs_idx + 1, n):
+                    distances[idx] = dist(lhs, sequence[rhs_idx])
+                    idx += 1
+
+            self._triu = distances
 
-        for lhs_idx, lhs in enumerate(self.sequence):
-            for rhs in self.sequence[(lhs_idx + 1) :]:
-                distances[idx] = dist(lhs, rhs)
-                idx += 1
+        return memoryview(self._triu).toreadonly()
 
-        return distances
+    def sorted_distances(self) -> memoryview:
+        """Return a read-only view of the distances between every mark of this ruler in increasing order."""
+        if self._sorted is None:
+            if self._triu is None:
+                self.triu_distances()
+            self._sorted = array(self.TYPECODE, sorted(self._triu))
+
+        return memoryview(self._sorted).toreadonly()
 
     # ---------------------------------------------------------------------------- #
     #                                Static Methods                                #
@@ -107,6 +175,31 @@ class GolombRuler:
         marks.extend(distances[: (order - 1)])
         return GolombRuler(marks)
 
+    @staticmethod
+    def from_buffer(buffer, assert_golomb_property=True) -> GolombRuler:
+        """Construct a new GolombRuler that reads its marks from `buffer` without copying them.
+
+        `buffer` is any one-dimensional buffer of integers, like an `array.array` or a NumPy array.
+        It must not be modified afterwards.
+        """
+        marks = memoryview(buffer)
+        if marks.ndim != 1 or marks.format not in "bBhHiIlLqQ":
+            raise ValueError(
+                f"Expected a one-dimensional buffer of integers, got format '{marks.format}' with {marks.ndim} dimensions"
+            )
+
+        if assert_golomb_property and not is_golomb_ruler(marks):
+            raise NotGolombRuler(
+                f"Input sequence: {marks.tolist()} does not satisfy the GolombRuler conditions."
+            )
+
+        ruler = GolombRuler.__new__(GolombRuler)
+        ruler._marks = marks.toreadonly()
+        ruler._length = None
+        ruler._triu = None
+        ruler._sorted = None
+        return ruler
+
     @staticmethod
     def generate_naive(order: int) -> GolombRuler:
         return GolombRuler(
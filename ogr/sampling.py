@@ -0,0 +1,220 @@
+"""Random golomb rulers with a given length, built mark by mark instead of drawn and rejected.
+
+A ruler whose first mark is 0 and last mark is `length` is grown from 0 in increasing order, with
+the bitsets of `ogr.enumerate`: a mark is only ever placed where its differences with the marks
+before it and with the mark at `length` are all new, so every ruler built is golomb.
+
+By default each mark is picked uniformly among the valid positions, stopping with the same odds
+as any position. This is fast but favours rulers with few marks. With `uniform`, every golomb
+ruler is equally likely: the number of rulers below each partial ruler is counted once, like
+`enumerate.count_rulers` does, and the next mark is picked with a probability proportional to it.
+The counts are memoized for every partial ruler, whose number grows exponentially with the length,
+so uniform draws are refused past `MAX_COUNTED_NODES` of them.
+"""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Iterator
+
+# Consecutive dead ends after which the default draws give up
+_MAX_DEAD_ENDS = 1000
+
+# Partial rulers counted at most for uniform draws, about 70 MB and reached around length 48
+MAX_COUNTED_NODES = 1 << 18
+
+
+def random_golomb_ruler(
+    length: int, order: int = None, uniform=False, rng: random.Random = None
+) -> list[int]:
+    """Return the marks of a random golomb ruler whose first mark is 0 and last mark is `length`.
+
+    `order` restricts the ruler to exactly `order` marks. The default draws then spread the marks
+    evenly and restart whenever they reach a partial ruler that can't be completed, which is
+    frequent when `order` is close to the largest order that fits in `length`. Raises `ValueError`
+    if no such ruler exists, without `uniform` if none is found after many restarts and with
+    `uniform` if the rulers are too many to count.
+    """
+    return sample_golomb_rulers(length, 1, order, uniform, rng)[0]
+
+
+def sample_golomb_rulers(
+    length: int, n: int, order: int = None, uniform=False, rng: random.Random = None
+) -> list[list[int]]:
+    """Return the marks of `n` random golomb rulers like `random_golomb_ruler`.
+
+    The counts behind `uniform` are shared by the whole batch, so drawing many rulers at once is
+    much cheaper than drawing them one by one.
+    """
+    return list(iter_golomb_rulers(length, n, order, uniform, rng))
+
+
+def iter_golomb_rulers(
+    length: int, n: int = None, order: int = None, uniform=False, rng: random.Random = None
+) -> Iterator[list[int]]:
+    """Yield `n` random golomb rulers, or an endless stream without `n`."""
+    if length < 0 or (order is not None and order < 1):
+        raise ValueError(f"No golomb ruler has length {length} and order {order}")
+
+    no_ruler = ValueError(f"No golomb ruler has length {length} and order {order}")
+    if order is not None:
+        # Imported here, the algebraic constructions behind `ogr.bounds` need NumPy
+        from .bounds import lower_bound
+
+        if length < lower_bound(order):
+            raise no_ruler
+
+    rng = rng or random.Random()
+    tree = _RulerTree(length, order)
+    tree.check()
+    if uniform and tree.count(tree.root) == 0:
+        raise no_ruler
+
+    draw = tree.draw_uniform if uniform else tree.draw
+    k = dead_ends = 0
+    while n is None or k < n:
+        marks = draw(rng)
+        if marks is None:
+            # Only a fixed order leads to dead ends
+            dead_ends += 1
+            if dead_ends == _MAX_DEAD_ENDS:
+                raise ValueError(
+                    f"Found no golomb ruler with length {length} and order {order} in {dead_ends} draws, try `uniform`"
+                )
+            continue
+        yield marks
+        k += 1
+        dead_ends = 0
+
+
+class _RulerTree:
+    """The partial rulers searched by `enumerate.iter_marks`, with the number of rulers below each.
+
+    A node is the tuple (pos, back, used, missing) of the last mark placed, the bitset of the marks
+    before it, the bitset of the differences taken, including the ones with the mark at `length`,
+    and the number of inner marks still to place, None when the order is free.
+    """
+
+    def __init__(self, length: int, order: int = None):
+        self.length = length
+        self.inner = None if order is None else order - 2
+        self.root = (0, 0, 1 << length, self.inner)
+        self._counts = {}
+
+    def children(self, node: tuple) -> list[tuple]:
+        """Return the nodes reached by placing one more inner mark after `node`."""
+        pos, back, used, missing = node
+        if missing is not None and missing <= 0:
+            return []
+
+        length = self.length
+        # Keep enough room for the inner marks that are still missing
+        last = length if missing is None else length - missing + 1
+        behind = back | 1
+        children = []
+        for candidate in range(pos + 1, last):
+            new = behind << (candidate - pos)
+            to_end = 1 << (length - candidate)
+            if new & used or to_end & (used | new):
+                continue
+            children.append(
+                (
+                    candidate,
+                    new,
+                    used | new | to_end,
+                    None if missing is None else missing - 1,
+                )
+            )
+        return children
+
+    def is_ruler(self, node: tuple) -> bool:
+        """Whether the marks of `node` followed by `length` form a ruler of the requested order."""
+        pos, _, _, missing = node
+        if self.length == 0:
+            return missing is None or missing == -1
+        return missing is None or missing == 0
+
+    def marks(self, node: tuple) -> list[int]:
+        """Return the marks of the ruler ending `node` with the mark at `length`."""
+        pos, back, _, _ = node
+        if self.length == 0:
+            return [0]
+        marks = [pos - b for b in range(pos, 0, -1) if back >> b & 1]
+        return marks + [pos, self.length] if pos > 0 else [0, self.length]
+
+    def count(self, node: tuple) -> int:
+        """Return the number of rulers of the requested order that extend `node`.
+
+        Raises `ValueError` once more than `MAX_COUNTED_NODES` partial rulers are memoized.
+        """
+        counts = self._counts
+        if node not in counts:
+            # Memoized on the whole tree at once, children before parents, to avoid deep recursion
+            stack = [node]
+            while stack:
+                if len(counts) > MAX_COUNTED_NODES:
+                    raise ValueError(
+                        f"Too many golomb rulers with length {self.length} to draw them uniformly, draw them mark by mark instead"
+                    )
+                top = stack[-1]
+                if top in counts:
+                    stack.pop()
+                    continue
+                children = self.children(top)
+                pending = [child for child in children if child not in counts]
+                if pending:
+                    stack.extend(pending)
+                    continue
+                stack.pop()
+                counts[top] = int(self.is_ruler(top)) + sum(
+                    counts[child] for child in children
+                )
+        return counts[node]
+
+    def check(self):
+        """Raise `ValueError` when the length and order rule out every ruler, before any draw."""
+        order = None if self.inner is None else self.inner + 2
+        if self.length < 0 or (order is not None and order < 1):
+            raise ValueError(f"No golomb ruler has length {self.length} and order {order}")
+        if order is not None and (order == 1) != (self.length == 0):
+            raise ValueError(
+                f"No golomb ruler has length {self.length} and order {order}, the ruler [0] is the only one with length 0 or a single mark"
+            )
+
+    def draw(self, rng: random.Random) -> list[int] | None:
+        """Return a ruler grown by picking each mark uniformly, or None at a dead end."""
+        self.check()
+        node = self.root
+        while True:
+            options = self.children(node)
+            pos, _, _, missing = node
+            if missing is not None and missing > 0:
+                # Gaps average the room left per missing mark, so that the marks don't pile up
+                # at the end and leave no room for the last ones
+                reach = pos + max(1, 2 * (self.length - pos) // (missing + 1))
+                options = [child for child in options if child[0] <= reach] or options
+            if self.is_ruler(node):
+                # Stopping is one more option
+                options.append(None)
+            if not options:
+                return None
+            choice = rng.choice(options)
+            if choice is None:
+                return self.marks(node)
+            node = choice
+
+    def draw_uniform(self, rng: random.Random) -> list[int]:
+        """Return a ruler drawn uniformly among the rulers of the requested order."""
+        self.check()
+        node = self.root
+        while True:
+            r = rng.randrange(self.count(node))
+            if self.is_ruler(node):
+                if r == 0:
+                    return self.marks(node)
+                r -= 1
+            for child in self.children(node):
+                if r < self.count(child):
+                    node = child
+                    break
+                r -= self.count(child)
@@ -4,6 +4,7 @@ from argparse import ArgumentParser
 
 from . import models
 from .exceptions import OrderTooLarge
+from .solvers import AMPLSolver
 
 
 def solve():
@@ -21,30 +22,154 @@ def solve():
     )
     parser.add_argument(
         "--formulation",
-        help="Which formulation of the problem we should use. Must be in ['ilp', 'ilpr', 'cp', 'qp']",
+        help="Which formulation of the problem we should use. Must be in ['ilp', 'rilp', 'ilpr', 'cp', 'qp', 'bnb']. 'bnb' searches in Python without AMPL, in seconds up to order 11 and about half a minute for order 12",
         default="ilp",
     )
+    parser.add_argument(
+        "--solver",
+        help="Which AMPL solver to use. Must be in ['cplex', 'gecode']. Defaults to 'gecode' for 'cp' and 'cplex' otherwise",
+        default=None,
+    )
     parser.add_argument(
         "--upper-bound",
-        help="Upper bound for Integer Linear Programming formulation.",
+        help="Upper bound for Integer Linear Programming formulation. Defaults to the tightest bound in ogr.bounds",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--backend",
+        help="How to run AMPL. Must be in ['subprocess', 'session']",
+        default="subprocess",
+    )
+    parser.add_argument(
+        "--no-cache",
+        help="Always run the solver instead of reusing a previously cached ruler",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--resume",
+        help="Start from the ruler checkpointed by a previous solve of this instance",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        help="Restart the solver from its best ruler every this many seconds, checkpointing it",
+        default=None,
+        type=float,
+    )
+    parser.add_argument(
+        "--no-warm-start",
+        help="Don't start the solver from a heuristic ruler",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--incumbent",
+        help="Marks of a ruler the solver starts from, it looks for shorter ones",
         default=None,
         type=int,
+        nargs="+",
+    )
+    parser.add_argument(
+        "--size",
+        help="Print the number of variables and constraints of the model instead of solving it",
+        action="store_true",
     )
 
     args = parser.parse_args()
 
-    if args.order > 10:
-        raise OrderTooLarge("Consider using an order less than 10..")
-
     try:
         formulation = models.Formulations.from_str(args.formulation)
     except Exception:
         print(
-            f"Oops! Problem formulation: '{args.formulation}' not recognized! Possible values: {{'ilp', 'ilpr', 'cp', 'qp'}}"
+            f"Oops! Problem formulation: '{args.formulation}' not recognized! Possible values: {{'ilp', 'rilp', 'ilpr', 'cp', 'qp', 'bnb'}}"
         )
         exit
 
+    if args.solver is None:
+        solver = formulation.default_solver()
+    else:
+        solver = AMPLSolver.from_str(args.solver)
+
+    if args.size:
+        upper_bound = args.upper_bound
+        if upper_bound is None:
+            from . import bounds
+
+            upper_bound = bounds.upper_bound(args.order)
+        size = formulation.model_size(args.order, upper_bound)
+        if size is None:
+            print(f"{formulation.name} does not build a model")
+        else:
+            print(f"variables: {size[0]}, constraints: {size[1]}")
+        return
+
+    # The size of the AMPL models explodes with the order, the branch and bound search does not
+    # build a model at all.
+    if args.order > 10 and formulation != models.Formulations.BranchAndBound:
+        raise OrderTooLarge("Consider using an order less than 10..")
+
     ruler = models.solve(
-        args.order, args.upper_bound, formulation, verbose=args.verbose
+        args.order,
+        args.upper_bound,
+        formulation,
+        solver,
+        verbose=args.verbose,
+        use_cache=not args.no_cache,
+        backend=models.AMPLBackend.from_str(args.backend),
+        resume=args.resume,
+        checkpoint_interval_s=args.checkpoint_interval,
+        warm_start=not args.no_warm_start,
+        incumbent=args.incumbent,
     )
     print(ruler)
+
+
+def sweep_orders():
+    """Script to solve a range of orders in parallel and collect the results."""
+
+    parser = ArgumentParser()
+
+    parser.add_argument("min_order", help="The smallest order to solve", type=int)
+    parser.add_argument("max_order", help="The largest order to solve", type=int)
+    parser.add_argument(
+        "--formulation",
+        help="Formulations to solve each order with. Must be in ['ilp', 'rilp', 'ilpr', 'cp', 'qp', 'bnb']",
+        nargs="+",
+        default=["ilp"],
+    )
+    parser.add_argument(
+        "--workers",
+        help="Number of worker processes. Defaults to the number of processors",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--timeout",
+        help="Time limit in seconds for each job",
+        default=60,
+        type=float,
+    )
+    parser.add_argument(
+        "--output",
+        help="Write the results to this parquet file",
+        default=None,
+    )
+
+    args = parser.parse_args()
+
+    formulations = [models.Formulations.from_str(f) for f in args.formulation]
+
+    # Imported here, polars is only needed by the sweeps
+    from . import sweep
+
+    df = sweep.solve_range(
+        range(args.min_order, args.max_order + 1),
+        formulations,
+        max_workers=args.workers,
+        timeout_s=args.timeout,
+        verbose=True,
+    )
+    print(df)
+
+    if args.output is not None:
+        df.write_parquet(args.output)
@@ -2,6 +2,8 @@
 
 For an exhaustive list, consult: https://dev.ampl.com/solvers/index.html"""
 
+from __future__ import annotations
+
 from enum import Enum
 
 
@@ -9,8 +11,32 @@ class AMPLSolver(Enum):
     """Python Enum to rep"""
 
     CPLEX = 1
+    # Constraint programming solver, the only one here that handles `alldiff`
+    GECODE = 2
 
     def ampl_name(self) -> str:
         """Return a string representation of this solver that is used inside AMPL source code."""
         if self == AMPLSolver.CPLEX:
             return "cplex"
+        elif self == AMPLSolver.GECODE:
+            return "gecode"
+
+    def cutoff_option(self) -> str | None:
+        """Return the option giving this solver an upper cutoff on the objective value, if it has one."""
+        if self == AMPLSolver.CPLEX:
+            return "uppercutoff"
+
+    def bound_option(self) -> str | None:
+        """Return the option asking this solver to report its best bound, if it has one."""
+        if self == AMPLSolver.CPLEX:
+            return "bestbound"
+
+    def from_str(input: str) -> AMPLSolver:
+        """Raises `ValueError` on bad input."""
+        input = input.lower()
+        if input == "cplex":
+            return AMPLSolver.CPLEX
+        elif input == "gecode":
+            return AMPLSolver.GECODE
+        else:
+            raise ValueError
@@ -0,0 +1,200 @@
+"""Columnar store of rulers, as a dataset of Parquet files.
+
+Each row holds the `marks` of a ruler as a list column along with its `order`, `length`, whether
+it is `golomb` and the `source` that produced it ("enum", "ls", "improved", ...). Rulers are
+written in bulk, one row group per batch, and every `RulerWriter` adds its own file to the dataset
+so that concurrent writers never clash.
+
+Reads memory-map the files and push the filters down to the Parquet row groups, so that a query
+like "all golomb rulers of order 8 with length <= 40" skips the row groups whose statistics rule
+them out instead of parsing them:
+
+    read_rulers(order=8, max_length=40, golomb=True)
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from collections.abc import Iterable, Iterator
+from os.path import join
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs
+import pyarrow.parquet as pq
+
+from .utils import data_dir, is_golomb_ruler
+
+SCHEMA = pa.schema(
+    [
+        pa.field("marks", pa.list_(pa.int64()), nullable=False),
+        pa.field("order", pa.int32(), nullable=False),
+        pa.field("length", pa.int64(), nullable=False),
+        pa.field("golomb", pa.bool_(), nullable=False),
+        pa.field("source", pa.string(), nullable=False),
+    ]
+)
+
+
+def store_path() -> str:
+    """Return the default location of the dataset, a folder in the user data dir."""
+    return join(data_dir(), "rulers")
+
+
+def rulers_table(
+    rulers: list[list[int]], source: str = "", golomb: bool = None
+) -> pa.Table:
+    """Return the table of `rulers`, whose marks must start at 0 and be sorted.
+
+    `golomb` tells whether every ruler is golomb, each ruler is checked when it is None.
+    """
+    marks = pa.array(rulers, type=pa.list_(pa.int64()))
+    offsets = marks.offsets.to_numpy()
+    values = marks.values.to_numpy()
+    orders = np.diff(offsets)
+    if len(rulers) > 0 and orders.min() < 1:
+        raise ValueError("Every ruler needs at least one mark")
+    lengths = values[offsets[1:] - 1] if len(rulers) > 0 else np.zeros(0, dtype=np.int64)
+
+    if golomb is None:
+        golombs = [is_golomb_ruler(ruler) for ruler in rulers]
+    else:
+        golombs = np.full(len(rulers), golomb)
+
+    return pa.Table.from_arrays(
+        [
+            marks,
+            pa.array(orders, type=pa.int32()),
+            pa.array(lengths, type=pa.int64()),
+            pa.array(golombs, type=pa.bool_()),
+            pa.array(np.full(len(rulers), source), type=pa.string()),
+        ],
+        schema=SCHEMA,
+    )
+
+
+class RulerWriter:
+    """Writes batches of rulers to a new Parquet file of the dataset at `path`.
+
+    Use it as a context manager, the file is only complete once the writer is closed.
+    """
+
+    def __init__(self, path: str = None, source: str = ""):
+        self.path = path if path is not None else store_path()
+        self.source = source
+        os.makedirs(self.path, exist_ok=True)
+        self.file = join(self.path, f"part-{uuid.uuid4().hex}.parquet")
+        self._writer = pq.ParquetWriter(self.file, SCHEMA)
+        self.count = 0
+
+    def write(self, rulers: list[list[int]], golomb: bool = None):
+        """Append the batch `rulers` as one row group, see `rulers_table` for `golomb`."""
+        if len(rulers) == 0:
+            return
+        self._writer.write_table(rulers_table(rulers, self.source, golomb))
+        self.count += len(rulers)
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self) -> RulerWriter:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_rulers(
+    batches: Iterable[list[list[int]]],
+    path: str = None,
+    source: str = "",
+    golomb: bool = None,
+) -> int:
+    """Write every batch of `batches`, like the ones of `enumerate.iter_rulers`, to the dataset.
+
+    Return the number of rulers written.
+    """
+    with RulerWriter(path, source) as writer:
+        for batch in batches:
+            writer.write(batch, golomb)
+    return writer.count
+
+
+def _filter(
+    order: int = None,
+    min_length: int = None,
+    max_length: int = None,
+    golomb: bool = None,
+    source: str = None,
+) -> ds.Expression | None:
+    """Return the expression selecting the rows that match every criterion given."""
+    conditions = []
+    if order is not None:
+        conditions.append(pc.field("order") == order)
+    if min_length is not None:
+        conditions.append(pc.field("length") >= min_length)
+    if max_length is not None:
+        conditions.append(pc.field("length") <= max_length)
+    if golomb is not None:
+        conditions.append(pc.field("golomb") == golomb)
+    if source is not None:
+        conditions.append(pc.field("source") == source)
+
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+
+def _dataset(path: str = None) -> ds.Dataset:
+    """Open the dataset at `path` with its files memory-mapped, empty if nothing was stored there."""
+    path = path if path is not None else store_path()
+    if not os.path.isdir(path):
+        return ds.dataset(SCHEMA.empty_table())
+
+    filesystem = pyarrow.fs.LocalFileSystem(use_mmap=True)
+    return ds.dataset(path, schema=SCHEMA, format="parquet", filesystem=filesystem)
+
+
+def read_rulers(
+    path: str = None,
+    order: int = None,
+    min_length: int = None,
+    max_length: int = None,
+    golomb: bool = None,
+    source: str = None,
+    columns: list[str] = None,
+) -> pa.Table:
+    """Return the stored rulers that match every criterion given, with the `columns` requested.
+
+    `polars.from_arrow` turns the result into a DataFrame without copying it.
+    """
+    return _dataset(path).to_table(
+        columns=columns, filter=_filter(order, min_length, max_length, golomb, source)
+    )
+
+
+def iter_stored_rulers(
+    path: str = None,
+    order: int = None,
+    min_length: int = None,
+    max_length: int = None,
+    golomb: bool = None,
+    source: str = None,
+) -> Iterator[list[list[int]]]:
+    """Yield the marks of the stored rulers that match, one record batch at a time.
+
+    Only a batch is held in memory at once, like `enumerate.iter_rulers`.
+    """
+    scanner = _dataset(path).scanner(
+        columns=["marks"],
+        filter=_filter(order, min_length, max_length, golomb, source),
+    )
+    for batch in scanner.to_batches():
+        if batch.num_rows > 0:
+            yield batch.column("marks").to_pylist()
@@ -0,0 +1,154 @@
+"""Solve many OGR instances in parallel across a pool of processes.
+
+Each (order, formulation, solver, upper_bound) combination is an independent job. Jobs are fanned
+out over a `ProcessPoolExecutor` and their results are streamed back as soon as they complete.
+"""
+
+from __future__ import annotations
+
+import signal
+import subprocess
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+import polars
+
+from . import models
+from .solvers import AMPLSolver
+
+
+class _JobTimeout(Exception):
+    """Raised inside a worker when a job exceeds its `timeout_s`."""
+
+
+def _raise_timeout(signum, frame):
+    raise _JobTimeout
+
+
+def _solve_job(
+    order: int,
+    formulation: models.Formulations,
+    solver: AMPLSolver,
+    upper_bound: int | None,
+    timeout_s: float,
+) -> dict:
+    """Solve a single instance inside a worker process and describe the outcome as a row."""
+    row = dict(
+        order=order,
+        formulation=formulation.name,
+        solver=solver.name,
+        upper_bound=upper_bound,
+        status="optimal",
+        length=None,
+        marks=None,
+        time_s=0.0,
+        solver_time_s=None,
+        nodes=None,
+        gap=None,
+    )
+
+    # The AMPL formulations honor `timeout_s` on their own, the alarm also covers in-process solves.
+    # It leaves the solvers the same grace as `models._kill_timeout` to return their best ruler.
+    alarm = timeout_s is not None and hasattr(signal, "setitimer")
+    if alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, models._kill_timeout(timeout_s))
+
+    start = time.time()
+    try:
+        result = models.solve_detailed(
+            order, upper_bound, formulation, solver, timeout_s
+        )
+        ruler = result.ruler
+        row["solver_time_s"] = result.solver_time_s
+        row["nodes"] = result.nodes
+        row["gap"] = result.gap
+        if ruler.order() != order:
+            # `models.solve` falls back to GolombRuler([0]) when AMPL produced no solution
+            row["status"] = "failed"
+        else:
+            row["length"] = ruler.length()
+            row["marks"] = list(ruler.sequence)
+    except (_JobTimeout, subprocess.TimeoutExpired):
+        row["status"] = "timeout"
+    except Exception as e:
+        row["status"] = f"error: {e!r}"
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        row["time_s"] = time.time() - start
+
+    return row
+
+
+def iter_solve_range(
+    orders: Iterable[int],
+    formulations: Iterable[models.Formulations] = (
+        models.Formulations.IntegerLinearProgram,
+    ),
+    solvers: Iterable[AMPLSolver] = (AMPLSolver.CPLEX,),
+    upper_bounds: dict[int, int] = None,
+    max_workers: int = None,
+    timeout_s: float = 60,
+) -> Iterator[dict]:
+    """Solve every combination of `orders`, `formulations` and `solvers`, yielding rows as they complete.
+
+    `upper_bounds` optionally maps an order to the upper bound passed to its jobs. `max_workers`
+    defaults to the number of processors on this machine.
+    """
+    upper_bounds = upper_bounds or {}
+    jobs = [
+        (order, formulation, solver, upper_bounds.get(order), timeout_s)
+        for order, formulation, solver in product(orders, formulations, solvers)
+    ]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_solve_job, *job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def solve_range(
+    orders: Iterable[int],
+    formulations: Iterable[models.Formulations] = (
+        models.Formulations.IntegerLinearProgram,
+    ),
+    solvers: Iterable[AMPLSolver] = (AMPLSolver.CPLEX,),
+    upper_bounds: dict[int, int] = None,
+    max_workers: int = None,
+    timeout_s: float = 60,
+    verbose=False,
+) -> polars.DataFrame:
+    """Solve every combination of `orders`, `formulations` and `solvers` in parallel.
+
+    Return one row per job, sorted by order, with the columns `order`, `formulation`, `solver`,
+    `upper_bound`, `status`, `length`, `marks`, `time_s` and the solver statistics `solver_time_s`,
+    `nodes` and `gap` of `telemetry.SolveResult`.
+    """
+    rows = []
+    for row in iter_solve_range(
+        orders, formulations, solvers, upper_bounds, max_workers, timeout_s
+    ):
+        if verbose:
+            print(
+                f"=> order {row['order']:3} {row['formulation']} ({row['solver']}): "
+                f"{row['status']}, length {row['length']} in {row['time_s']:.3f}s"
+            )
+        rows.append(row)
+
+    schema = dict(
+        order=polars.Int64,
+        formulation=polars.Utf8,
+        solver=polars.Utf8,
+        upper_bound=polars.Int64,
+        status=polars.Utf8,
+        length=polars.Int64,
+        marks=polars.List(polars.Int64),
+        time_s=polars.Float64,
+        solver_time_s=polars.Float64,
+        nodes=polars.Int64,
+        gap=polars.Float64,
+    )
+    return polars.DataFrame(rows, schema=schema).sort(["order", "formulation", "solver"])
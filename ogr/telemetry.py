@@ -0,0 +1,140 @@
+"""Structured description of where the time of a solve goes.
+
+Every solve of `models.solve_detailed` produces a `SolveResult`, which is handed to the hooks
+registered with `add_hook` before being returned. `JsonLinesHook` appends the results to a file, any
+other callable taking a `SolveResult` can forward them to a metrics system.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import TextIO
+
+from .ruler import GolombRuler
+
+
+@dataclass
+class SolveResult:
+    """The ruler found by a solve along with its timings and solver statistics.
+
+    Statistics that the backend doesn't report are None.
+    """
+
+    ruler: GolombRuler
+    order: int
+    formulation: str
+    solver: str
+    backend: str
+    upper_bound: int = None
+    lower_bound: int = None
+    # `solve_result` of AMPL, "solved" for in-process searches that completed
+    status: str = None
+    cached: bool = False
+    # Time spent generating the AMPL source code
+    generation_time_s: float = 0.0
+    # Wall time of the whole ampl process or session call, minus the time reported by AMPL
+    spawn_time_s: float = None
+    # `_solve_elapsed_time`: wall time of the solver alone
+    solver_time_s: float = None
+    wall_time_s: float = 0.0
+    nodes: int = None
+    iterations: int = None
+    gap: float = None
+    # `_nvars` and `_ncons` of the model sent to the solver
+    variables: int = None
+    constraints: int = None
+
+    def to_dict(self) -> dict:
+        """Return a JSON serializable description, with the marks of the ruler."""
+        row = asdict(self)
+        row["ruler"] = list(self.ruler.sequence)
+        return row
+
+
+# ---------------------------------------------------------------------------- #
+#                                     Hooks                                    #
+# ---------------------------------------------------------------------------- #
+
+_HOOKS: list[Callable[[SolveResult], None]] = []
+
+
+def add_hook(hook: Callable[[SolveResult], None]):
+    """Call `hook` with the `SolveResult` of every subsequent solve."""
+    _HOOKS.append(hook)
+
+
+def remove_hook(hook: Callable[[SolveResult], None]):
+    """Stop calling `hook`. Raises `ValueError` if it wasn't added."""
+    _HOOKS.remove(hook)
+
+
+def emit(result: SolveResult):
+    """Hand `result` to every hook. A failing hook never fails the solve."""
+    for hook in list(_HOOKS):
+        try:
+            hook(result)
+        except Exception as e:
+            print(f"Telemetry hook {hook!r} failed: {e!r}", file=sys.stderr)
+
+
+class JsonLinesHook:
+    """Write each `SolveResult` as one line of JSON to `path`, or to an open text `stream`."""
+
+    def __init__(self, path: str = None, stream: TextIO = None):
+        if (path is None) == (stream is None):
+            raise ValueError("Exactly one of path and stream must be given")
+        self.path = path
+        self.stream = stream
+
+    def __call__(self, result: SolveResult):
+        line = json.dumps(result.to_dict()) + "\n"
+        if self.stream is not None:
+            self.stream.write(line)
+            self.stream.flush()
+        else:
+            with open(self.path, "a") as file:
+                file.write(line)
+
+
+# ---------------------------------------------------------------------------- #
+#                                 AMPL statistics                              #
+# ---------------------------------------------------------------------------- #
+
+_SCALARS = {
+    "solver_time_s": (r"^_solve_elapsed_time = (\S+)", float),
+    "ampl_time_s": (r"^_ampl_elapsed_time = (\S+)", float),
+    "variables": (r"^_nvars = (\d+)", int),
+    "constraints": (r"^_ncons = (\d+)", int),
+    "best_bound": (r"^total_length\.bestbound = (\S+)", float),
+    "objective": (r"^total_length = (\S+)", float),
+    # Printed by the solvers in their solve message
+    "nodes": (r"(\d+) (?:branch-and-bound|branch-and-cut|B&B) nodes", int),
+    "iterations": (r"(\d+) (?:MIP |dual |primal )?simplex iterations", int),
+}
+
+
+def parse_ampl_stats(output: str) -> dict:
+    """Extract the statistics displayed by `ampl.ampl_display_results` and the solve message."""
+    stats = {}
+    for name, (pattern, convert) in _SCALARS.items():
+        match = re.search(pattern, output, re.MULTILINE)
+        if match is not None:
+            try:
+                stats[name] = convert(match.group(1))
+            except ValueError:
+                pass
+
+    return stats
+
+
+def relative_gap(objective: float, best_bound: float) -> float | None:
+    """Return the relative gap between a minimized `objective` and the solver's `best_bound`."""
+    if objective is None or best_bound is None:
+        return None
+    if objective == 0:
+        return 0.0
+    return max(0.0, (objective - best_bound) / abs(objective))
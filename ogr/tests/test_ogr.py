@@ -1,4 +1,10 @@
 from .. import *
+from ..differences import DifferenceSet
+from ..exceptions import NotGolombRuler
+from ..utils import is_golomb_ruler
+
+from os.path import join
+from shutil import which
 
 import pytest
 
@@ -8,3 +14,855 @@ def test_enumeration():
     r = GolombRuler(rlr, assert_golomb_property=True)
     print(f"Golomb ruler with length: {r.length()} order: {r.order()}")
     print(r)
+
+
+def test_solve_exact():
+    # Lengths of the optimal rulers with 1 to 9 marks
+    optimal_lengths = [0, 1, 3, 6, 11, 17, 25, 34, 44]
+
+    for order, length in enumerate(optimal_lengths, start=1):
+        r = solve_exact(order)
+        assert r.order() == order
+        assert r.length() == length
+
+    from ..exceptions import InfeasibleInstance, SearchTimeout
+    from ..models import Formulations, solve_detailed
+
+    # The bounds restrict the lengths searched
+    assert solve_exact(5, lower_bound=12).sequence == [0, 1, 3, 7, 12]
+    assert solve_exact(1, upper_bound=0).sequence == [0]
+    with pytest.raises(InfeasibleInstance):
+        solve_exact(7, upper_bound=24)
+    with pytest.raises(SearchTimeout):
+        solve_exact(14, timeout_s=0.05)
+
+    bnb = Formulations.BranchAndBound
+    result = solve_detailed(14, formulation=bnb, timeout_s=0.05, use_cache=False)
+    assert result.status == "limit" and result.ruler.order() == 1
+    result = solve_detailed(7, 30, bnb, use_cache=False, lower_bound=26)
+    assert result.status == "solved" and result.ruler.length() == 26
+
+
+def test_difference_set():
+    ds = DifferenceSet([0, 1, 4])
+    assert ds.distances() == [1, 3, 4]
+    assert not ds.can_add(2)  # 2 - 1 == 1 - 0
+    assert not ds.can_add(4)
+    assert ds.can_add(9)
+
+    ds.add(9)
+    assert ds.length() == 9
+    with pytest.raises(NotGolombRuler):
+        ds.add(7)
+
+    ds.remove(9)
+    assert ds.distances() == [1, 3, 4]
+    assert ds.can_add(6)
+
+    assert is_golomb_ruler([4, 0, 1])
+    assert not is_golomb_ruler([0, 1, 2])
+    assert not is_golomb_ruler([0, 0])
+
+
+def test_is_golomb_batch():
+    import numpy as np
+
+    from ..batch import is_golomb_batch, is_golomb_ragged, triu_distances_batch
+
+    marks = np.array([[0, 1, 3], [0, 1, 2], [0, 2, 2], [0, 3, 1]])
+    assert is_golomb_batch(marks).tolist() == [True, False, False, True]
+    assert triu_distances_batch(marks[:1]).tolist() == [
+        GolombRuler([0, 1, 3]).triu_distances().tolist()
+    ]
+    assert is_golomb_ragged([[0], [0, 1, 2], [0, 1, 4, 6]]).tolist() == [
+        True,
+        False,
+        True,
+    ]
+
+
+def test_solve_range():
+    from ..models import Formulations
+    from ..sweep import solve_range
+
+    df = solve_range(range(2, 8), [Formulations.BranchAndBound], max_workers=2)
+    assert df["order"].to_list() == list(range(2, 8))
+    assert df["length"].to_list() == [1, 3, 6, 11, 17, 25]
+    assert (df["status"] == "optimal").all()
+
+
+def test_result_cache(tmp_path):
+    from ..cache import ResultCache
+
+    cache = ResultCache(join(tmp_path, "cache.sqlite"), max_entries=2)
+    ruler = GolombRuler([0, 1, 4, 6])
+
+    cache.put(4, 7, "ilp", "cplex", "source", ruler, 1.5, "solved")
+    assert cache.get(4, 7, "ilp", "cplex", "source").sequence == ruler.sequence
+
+    # Entries are invalidated by a change of the AMPL source
+    assert cache.get(4, 7, "ilp", "cplex", "changed") is None
+    assert len(cache) == 0
+
+    for upper_bound in range(3):
+        cache.put(4, upper_bound, "ilp", "cplex", "source", ruler, 1.5, "solved")
+    assert len(cache) == 2
+    assert cache.get(4, 0, "ilp", "cplex", "source") is None
+
+
+def test_bounds():
+    from .. import bounds
+    from ..constructions import (
+        best_construction,
+        bose_chowla,
+        ruzsa,
+        singer,
+        truncate_modular,
+    )
+
+    for order in range(1, 29):
+        optimal = bounds.KNOWN_OPTIMAL_LENGTHS[order - 1]
+        assert bounds.lower_bound(order) <= optimal <= bounds.upper_bound(order)
+
+    assert bounds.lower_bound(100) <= bounds.upper_bound(100)
+
+    for prime in [5, 7, 11, 13]:
+        for marks, modulus in [ruzsa(prime), singer(prime), bose_chowla(prime)]:
+            assert is_golomb_ruler(truncate_modular(marks, modulus, len(marks)))
+            differences = [(a - b) % modulus for a in marks for b in marks if a != b]
+            assert len(set(differences)) == len(differences)
+
+    for order in [3, 10, 24, 150]:
+        marks, _ = best_construction(order)
+        assert len(marks) == order and is_golomb_ruler(marks)
+    assert best_construction(24)[0][-1] == bounds.KNOWN_OPTIMAL_LENGTHS[23]
+
+
+def test_race():
+    import asyncio
+
+    from ..models import Formulations, race
+    from ..solvers import AMPLSolver
+
+    ruler, formulation, _ = asyncio.run(
+        race(6, [(Formulations.BranchAndBound, AMPLSolver.CPLEX)])
+    )
+    assert ruler.length() == 17
+    assert formulation == Formulations.BranchAndBound
+
+
+def test_race_errors(monkeypatch):
+    import asyncio
+
+    from .. import models
+    from ..exceptions import AMPLNotFound, SolveError
+    from ..models import Formulations, race
+    from ..solvers import AMPLSolver
+
+    def missing_ampl():
+        raise AMPLNotFound
+
+    monkeypatch.setattr(models, "ampl_path", missing_ampl)
+    ilp = (Formulations.IntegerLinearProgram, AMPLSolver.CPLEX)
+    with pytest.raises(AMPLNotFound):
+        asyncio.run(race(6, [ilp]))
+
+    # The search runs out of time without a ruler
+    bnb = (Formulations.BranchAndBound, AMPLSolver.CPLEX)
+    with pytest.raises(SolveError) as info:
+        asyncio.run(race(16, [ilp, bnb], timeout_s=0.01))
+    assert isinstance(info.value.__cause__, AMPLNotFound)
+
+
+def test_ruler_from_buffer():
+    from array import array
+
+    marks = array("i", [0, 1, 4, 9, 11])
+    r = GolombRuler.from_buffer(marks)
+    assert r == GolombRuler([0, 1, 4, 9, 11])
+    assert r.length() == 11
+    assert r.sorted_distances().tolist() == sorted(r.triu_distances())
+
+    # The distances are computed once and can't be changed through the view
+    assert r.triu_distances().obj is r.triu_distances().obj
+    with pytest.raises(TypeError):
+        r.triu_distances()[0] = 0
+
+    with pytest.raises(NotGolombRuler):
+        GolombRuler.from_buffer(array("i", [0, 1, 2]))
+
+
+def test_iter_rulers():
+    from ..enumerate import count_rulers, iter_rulers
+
+    batches = list(iter_rulers(6, order=4, batch_size=1))
+    assert batches == [[[0, 1, 4, 6]], [[0, 2, 5, 6]]]
+
+    # Every subset of the inner marks
+    assert count_rulers(10, golomb_only=False) == 2**9
+    assert count_rulers(34, order=8) == 2
+
+
+def test_reduced_lp_domains():
+    from ..ampl import (
+        ogr_integer_lp_size,
+        ogr_reduced_lp_domains,
+        ogr_reduced_lp_model,
+        ogr_reduced_lp_size,
+    )
+
+    for order in range(3, 9):
+        ruler = solve_exact(order)
+        marks = ruler.sequence
+        domains = ogr_reduced_lp_domains(order, ruler.length())
+        # Pruning must keep the distances of an optimal ruler
+        for (i, j), domain in domains.items():
+            assert marks[j - 1] - marks[i - 1] in domain
+
+        assert ogr_reduced_lp_size(order, 2 * ruler.length()) < ogr_integer_lp_size(
+            order, 2 * ruler.length()
+        )
+
+    # A ruler with 2 marks is its own mirror image
+    assert "mirror_symmetry" not in ogr_reduced_lp_model(2, 1)
+    assert "mirror_symmetry" in ogr_reduced_lp_model(3, 3)
+
+
+def test_formulations():
+    from ..ampl import ogr_mark_domains
+    from ..models import Formulations
+    from ..solvers import AMPLSolver
+
+    for formulation in Formulations:
+        if formulation == Formulations.BranchAndBound:
+            continue
+        source_code = formulation.callback()(6, 20, AMPLSolver.CPLEX, 17)
+        assert "minimize total_length" in source_code
+        assert "display d;" in source_code
+        # A ruler with 2 marks is its own mirror image
+        assert "mirror_symmetry" not in formulation.callback()(2, 1, AMPLSolver.CPLEX)
+
+    # The marks of an optimal ruler lie in their domains
+    ruler = solve_exact(7)
+    domains = ogr_mark_domains(7, ruler.length())
+    assert all(mark in domain for mark, domain in zip(ruler.sequence, domains))
+
+    ilp = Formulations.IntegerLinearProgram.model_size(9, 60)
+    for formulation in [Formulations.ConstraintProgram, Formulations.QuadraticProgram]:
+        assert formulation.model_size(9, 60)[0] < ilp[0]
+
+
+def test_telemetry():
+    from io import StringIO
+    import json
+
+    from .. import models, telemetry
+
+    output = """CPLEX 20.1.0.0: optimal integer solution; objective 6
+25 MIP simplex iterations
+0 branch-and-bound nodes
+solve_result = solved
+_solve_elapsed_time = 0.012
+_ampl_elapsed_time = 0.031
+_nvars = 42
+_ncons = 30
+total_length = 6
+total_length.bestbound = 5.5
+"""
+    stats = telemetry.parse_ampl_stats(output)
+    assert stats["iterations"] == 25 and stats["nodes"] == 0
+    assert stats["variables"] == 42 and stats["constraints"] == 30
+    assert stats["solver_time_s"] == 0.012
+    assert telemetry.relative_gap(stats["objective"], stats["best_bound"]) == 0.5 / 6
+
+    stream = StringIO()
+    hook = telemetry.JsonLinesHook(stream=stream)
+    telemetry.add_hook(hook)
+    try:
+        result = models.solve_detailed(5, formulation=models.Formulations.BranchAndBound)
+    finally:
+        telemetry.remove_hook(hook)
+
+    assert result.ruler.length() == 11
+    assert json.loads(stream.getvalue())["ruler"] == [0, 1, 4, 9, 11]
+
+
+def test_bench(tmp_path, monkeypatch):
+    from .. import bench
+
+    results = bench.run_benchmarks(
+        range(3, 6), ["generate_improved", "is_golomb_ruler"], repeat=1
+    )
+    assert len(results) == 6
+    assert (results["status"] == "ok").all()
+
+    history = join(tmp_path, "history.parquet")
+    bench.append_history(results, history)
+    assert len(bench.append_history(results, history)) == 12
+
+    # Twice as slow as the baseline
+    slower = results.with_columns(best_s=results["best_s"] * 2)
+    compared = bench.compare(slower, results)
+    assert compared["regression"].all()
+    assert not bench.compare(results, results)["regression"].any()
+
+    # A failing benchmark is reported instead of aborting the run
+    def broken(order):
+        raise ValueError("broken")
+
+    monkeypatch.setitem(bench.BENCHMARKS, "broken", broken)
+    failed = bench.run_benchmarks([3], ["broken", "generate_improved"], repeat=1)
+    assert failed["status"].to_list() == ["error: ValueError('broken')", "ok"]
+
+
+def test_greedy_generation():
+    rulers = list(generate_golomb_rulers_improved(60))
+    assert rulers[3] == [0, 1, 3, 7]
+    for order, marks in enumerate(rulers, 1):
+        assert len(marks) == order
+        assert is_golomb_ruler(marks)
+        assert marks == generate_golomb_ruler_improved(order)
+
+    # The generation doesn't recurse
+    import sys
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(100)
+    try:
+        marks = generate_golomb_ruler_improved(300)
+    finally:
+        sys.setrecursionlimit(limit)
+    assert is_golomb_ruler(marks)
+
+    # Each mark is the smallest one keeping the golomb property
+    greedy, differences = [0], set()
+    while len(greedy) < 100:
+        x = greedy[-1] + 1
+        while any(x - m in differences for m in greedy):
+            x += 1
+        differences.update(x - m for m in greedy)
+        greedy.append(x)
+    assert marks[:100] == greedy
+
+
+def test_search_parallel(tmp_path):
+    import json
+
+    from ..distributed import search_parallel
+
+    checkpoint = join(tmp_path, "search.json")
+    for order in range(4, 9):
+        ruler = search_parallel(order, max_workers=2, checkpoint=checkpoint)
+        assert ruler.length() == solve_exact(order).length()
+
+    # Every unit of the last search is completed, resuming only reads the checkpoint
+    with open(checkpoint) as file:
+        state = json.load(file)
+    assert state["order"] == 8 and len(state["done"]) > 0
+    resumed = search_parallel(8, checkpoint=checkpoint, resume=True)
+    assert resumed.sequence == state["best"]
+
+
+def test_search_unit_below_optimum(monkeypatch):
+    import multiprocessing
+
+    from .. import distributed
+
+    tried = []
+    search_length = distributed.search_length
+
+    def record(order, length, spans, prefix):
+        tried.append(length)
+        return search_length(order, length, spans, prefix)
+
+    monkeypatch.setattr(distributed, "search_length", record)
+    monkeypatch.setattr(distributed, "_BEST", None)
+    monkeypatch.setattr(distributed, "_SPANS", None)
+
+    # The spans don't come from the table of known optimal lengths
+    spans = distributed._spans(6)
+    assert spans == [0, 0, 1, 3, 6, 11, 15]
+
+    # The unit starts below the optimum of 17 and climbs to it
+    distributed._init_worker(multiprocessing.Value("q", 18), spans)
+    unit, marks = distributed._search_unit(6, (1, 4))
+    assert list(marks) == [0, 1, 4, 10, 12, 17]
+    assert tried[0] < 17 and tried[-1] == 17
+
+
+def test_search_length():
+    from ..search import search_length
+
+    # Lengths of the optimal rulers with 0 to 7 marks
+    spans = [0, 0, 1, 3, 6, 11, 17, 25]
+    assert search_length(8, 34, spans, (1, 4)) == [0, 1, 4, 9, 15, 22, 32, 34]
+    assert search_length(8, 34, spans) == [0, 1, 4, 9, 15, 22, 32, 34]
+    # The only other optimal ruler is the mirror image, whose first gap is the larger one
+    assert search_length(8, 34, spans, (2,)) is None
+    assert search_length(8, 33, spans) is None
+    assert search_length(8, 34, spans, (1, 2)) is None
+
+
+def test_resume_enumeration():
+    from ..enumerate import iter_marks
+
+    for order in [None, 4, 5]:
+        rulers = list(iter_marks(13, order))
+        for k, marks in enumerate(rulers):
+            assert list(iter_marks(13, order, after=marks)) == rulers[k + 1 :]
+
+
+def test_warm_start():
+    from .. import bounds, models
+    from ..ampl import ogr_integer_lp
+    from ..solvers import AMPLSolver
+
+    for order in range(1, 40):
+        marks = bounds.heuristic_ruler(order)
+        assert is_golomb_ruler(marks) and len(marks) == order
+        assert bounds.lower_bound(order) <= marks[-1]
+
+    marks = list(bounds.heuristic_ruler(8))
+    source_code = ogr_integer_lp(8, marks[-1], AMPLSolver.CPLEX, 34, marks)
+    assert source_code.count("let d[") == 8 * 7 // 2
+
+    env = models._solver_env(AMPLSolver.CPLEX, 10, marks[-1])
+    assert f"uppercutoff={marks[-1]}" in env["cplex_options"].split()
+
+
+def test_warm_start_reaches_solver(monkeypatch, tmp_path):
+    import json
+    import os
+    import stat
+    import sys
+
+    from .. import bounds, models
+
+    # Records the script and the solver options it is run with, then answers an optimal ruler
+    record = join(tmp_path, "record.json")
+    fake_ampl = join(tmp_path, "ampl")
+    with open(fake_ampl, "w") as file:
+        file.write(
+            f"""#!{sys.executable}
+import json, os, sys
+with open(sys.argv[1]) as script, open({record!r}, "w") as record:
+    json.dump(dict(source=script.read(), options=os.environ["cplex_options"]), record)
+marks = [0, 1, 6, 10, 23, 26, 34, 41, 53, 55]
+status = os.environ.get("FAKE_SOLVE_RESULT", "solved")
+print("solve_result =", status)
+if status == "infeasible":
+    sys.exit()
+print("d :=")
+for j, m in enumerate(marks[1:], 2):
+    print(1, j, m)
+print(";")
+"""
+        )
+    os.chmod(fake_ampl, os.stat(fake_ampl).st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(models, "ampl_path", lambda: fake_ampl)
+    monkeypatch.setattr(models, "data_dir", lambda: str(tmp_path))
+    monkeypatch.setattr(models, "checkpoint_path", lambda name: join(tmp_path, name))
+
+    def solve(**kwargs):
+        result = models.solve_detailed(10, use_cache=False, **kwargs)
+        with open(record) as file:
+            return result, json.load(file)
+
+    # The default upper bound is left alone, a heuristic ruler longer than it is ignored
+    result, seen = solve()
+    assert result.upper_bound == bounds.upper_bound(10)
+    assert "uppercutoff" not in seen["options"] and "let d[" not in seen["source"]
+
+    # Within the upper bound, the solver looks for rulers shorter than the heuristic one
+    heuristic = bounds.heuristic_ruler(10)
+    result, seen = solve(upper_bound=heuristic[-1])
+    assert result.ruler.length() == 55 and result.upper_bound == heuristic[-1]
+    assert f"uppercutoff={heuristic[-1] - 1}" in seen["options"].split()
+    assert seen["source"].count("let d[") == 45
+
+    # With an optimal incumbent nothing passes the cutoff, the incumbent is solved and cached
+    monkeypatch.setenv("FAKE_SOLVE_RESULT", "infeasible")
+    result, seen = solve(incumbent=[0, 1, 6, 10, 23, 26, 34, 41, 53, 55])
+    assert result.status == "solved" and result.ruler.length() == 55
+    checkpoint = models.checkpoint_path("solve_10_55_55_IntegerLinearProgram_CPLEX")
+    assert models._read_incumbent(checkpoint, 10)[1] == "solved"
+    monkeypatch.delenv("FAKE_SOLVE_RESULT")
+
+    # An unsorted incumbent is sorted and shifted to 0
+    marks = [0, 1, 6, 10, 23, 26, 34, 41, 53, 55]
+    result, seen = solve(incumbent=[m + 5 for m in reversed(marks)], warm_start=False)
+    assert "uppercutoff=54" in seen["options"].split()
+    assert "let d[1, 10] := 55;" in seen["source"]
+    assert "-" not in "".join(line for line in seen["source"].split("\n") if "let" in line)
+
+    result, seen = solve(warm_start=False)
+    assert "uppercutoff" not in seen["options"] and "let d[" not in seen["source"]
+
+
+def test_solve_in_slices(monkeypatch, tmp_path):
+    from .. import models
+    from ..models import Formulations
+    from ..solvers import AMPLSolver
+
+    def output(status, marks=None):
+        if marks is None:
+            return f"solve_result = {status}\n"
+        distances = "\n".join(f"1 {j}   {m}" for j, m in enumerate(marks[1:], 2))
+        return f"solve_result = {status}\n\nd :=\n{distances}\n;\n"
+
+    def run(outputs):
+        calls = []
+
+        def run_ampl(source_code, solver, timeout_s, cutoff=None):
+            calls.append((timeout_s, cutoff))
+            return outputs[len(calls) - 1]
+
+        monkeypatch.setattr(models, "_run_ampl", run_ampl)
+        ruler, status, _ = models._solve_in_slices(
+            4,
+            10,
+            6,
+            Formulations.IntegerLinearProgram,
+            AMPLSolver.CPLEX,
+            None,
+            1,
+            [0, 1, 5, 7],
+            join(tmp_path, "slices.json"),
+        )
+        return ruler.sequence, status, calls
+
+    # A status other than "limit" ends the solve, even without a timeout. Only strictly shorter
+    # rulers are looked for, nothing shorter than the best ruler proves it optimal
+    assert run([output("limit", [0, 1, 4, 6]), output("infeasible")]) == (
+        [0, 1, 4, 6],
+        "solved",
+        [(1, 6), (1, 5)],
+    )
+    assert run([output("failure")])[1] == "failure"
+    # A slice that didn't shorten the ruler is followed by a longer one
+    assert run([output("limit"), output("solved", [0, 1, 4, 6])])[2] == [(1, 6), (2, 6)]
+
+
+def test_sampling(monkeypatch):
+    import random
+    from collections import Counter
+
+    from .. import sampling
+    from ..enumerate import iter_marks
+    from ..sampling import random_golomb_ruler, sample_golomb_rulers
+
+    rng = random.Random(0)
+    for order in [None, 4, 5]:
+        rulers = {tuple(marks) for marks in iter_marks(17, order)}
+        for uniform in [False, True]:
+            sample = sample_golomb_rulers(17, 200, order, uniform, rng)
+            assert {tuple(marks) for marks in sample} <= rulers
+
+    # Every golomb ruler of length 9 is about as likely
+    counts = Counter(
+        tuple(marks) for marks in sample_golomb_rulers(9, 6000, uniform=True, rng=rng)
+    )
+    assert len(counts) == len(list(iter_marks(9)))
+    assert max(counts.values()) < 2 * min(counts.values())
+
+    marks = random_golomb_ruler(300, 12, rng=rng)
+    assert is_golomb_ruler(marks) and len(marks) == 12 and marks[-1] == 300
+    with pytest.raises(ValueError):
+        random_golomb_ruler(10, 6)
+
+    # A single mark only fits a ruler of length 0, refused up front rather than after many draws
+    assert random_golomb_ruler(0, 1) == [0]
+    for uniform in [False, True]:
+        with pytest.raises(ValueError, match="single mark"):
+            random_golomb_ruler(5, 1, uniform)
+    with pytest.raises(ValueError, match="single mark"):
+        sampling._RulerTree(5, 1).draw(rng)
+
+    # Counting every partial ruler is refused past a size, drawing mark by mark isn't
+    monkeypatch.setattr(sampling, "MAX_COUNTED_NODES", 1000)
+    with pytest.raises(ValueError):
+        random_golomb_ruler(40, uniform=True)
+    assert is_golomb_ruler(random_golomb_ruler(150, rng=rng))
+
+
+def test_lazy_import():
+    import subprocess
+    import sys
+
+    # Neither the AMPL layer nor NumPy are imported until they are used
+    code = (
+        "import sys, ogr; "
+        "assert 'ogr.models' not in sys.modules and 'numpy' not in sys.modules; "
+        "assert ogr.GolombRuler([0, 1, 3]).length() == 3; "
+        "assert 'ogr.models' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    # Nor are the dataframes, the result cache and amplpy by the solve scripts
+    code = (
+        "import sys, ogr.scripts, ogr.models; "
+        "heavy = {'polars', 'pyarrow', 'amplpy', 'ogr.cache', 'ogr.ampl.session'}; "
+        "assert not heavy & set(sys.modules), heavy & set(sys.modules)"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    from .. import bench
+
+    results = bench.run_benchmarks(range(2, 5), ["import_ogr"], repeat=1)
+    assert len(results) == 1 and (results["status"] == "ok").all()
+
+
+def test_store(tmp_path):
+    from ..enumerate import iter_marks, iter_rulers
+    from ..store import iter_stored_rulers, read_rulers, write_rulers
+
+    path = str(tmp_path)
+    for length in range(20, 31):
+        write_rulers(iter_rulers(length, batch_size=256), path, "enum", golomb=True)
+    assert write_rulers([[[0, 1, 2, 3], [0, 2, 5]]], path, "test") == 2
+
+    table = read_rulers(path, order=6, max_length=25, golomb=True)
+    expected = [marks for length in range(20, 26) for marks in iter_marks(length, 6)]
+    assert sorted(table.column("marks").to_pylist()) == sorted(expected)
+    assert set(table.column("length").to_pylist()) <= set(range(20, 26))
+
+    not_golomb = read_rulers(path, golomb=False)
+    assert not_golomb.column("marks").to_pylist() == [[0, 1, 2, 3]]
+    assert sum(len(batch) for batch in iter_stored_rulers(path, source="test")) == 2
+
+    # Nothing stored yet
+    missing = join(path, "missing")
+    assert read_rulers(missing, order=6).num_rows == 0
+    assert list(iter_stored_rulers(missing)) == []
+
+
+def test_codec():
+    import numpy as np
+
+    from .. import codec
+    from ..enumerate import iter_marks
+
+    # The ids of the rulers with a given length are a contiguous range
+    for length in range(8):
+        lo, hi = codec.id_range(length)
+        rulers = codec.rows(codec.marks_from_id_range(lo, hi + 1))
+        assert sorted(rulers) == sorted(iter_marks(length, golomb_only=False))
+        assert [codec.to_id(marks) for marks in rulers] == list(range(lo, hi + 1))
+
+    ids = np.array([0, 1, 11, (1 << 40) + 5, (1 << 63) - 1])
+    marks = codec.marks_from_ids(ids)
+    assert marks.shape == (5, 64)
+    assert codec.rows(marks) == [codec.from_id(int(id)) for id in ids]
+    assert codec.rows(marks)[2] == [0, 1, 2, 4]
+    assert (codec.ids_from_marks(marks) == ids).all()
+    assert codec.from_id(1 << 100) == [0, 101]
+    with pytest.raises(ValueError):
+        codec.marks_from_ids([1 << 63])
+
+
+def test_mutable_ruler():
+    from ..mutable import MutableRuler
+
+    ruler = GolombRuler([0, 1, 4, 9, 11]).mutable()
+    assert ruler.is_golomb_ruler()
+
+    # 10 repeats the distances 1 (twice), 9 and 10
+    assert ruler.insert_cost(10) == 4
+    assert ruler.move_cost(11, 10) == 2
+    assert ruler.move_mark(11, 10) == [(1, 10), (9, 10)]
+    assert ruler.collision_count() == 2
+    assert ruler.colliding_pairs() == {1: [(0, 1), (9, 10)], 9: [(0, 9), (1, 10)]}
+    with pytest.raises(NotGolombRuler):
+        ruler.to_ruler()
+
+    ruler.delete_mark(10)
+    ruler.insert_mark(11)
+    assert ruler.to_ruler() == GolombRuler([0, 1, 4, 9, 11])
+
+    ruler = MutableRuler([0, 1, 2, 3])
+    assert ruler.collision_count() == 3 and ruler.distance_count(1) == 3
+    assert ruler.move_cost(3, 6) == -2
+    ruler.move_mark(3, 6)
+    assert ruler.collision_count() == 1 and ruler.sequence == [0, 1, 2, 6]
+
+
+def test_heuristics():
+    from ..heuristics import Heuristic, optimize, search
+
+    # Start from the greedy ruler, much longer than the optimal one
+    greedy = generate_golomb_ruler_improved(8)
+    for heuristic in Heuristic:
+        ruler = search(8, heuristic, time_budget_s=1, seed=0, marks=greedy)
+        assert is_golomb_ruler(ruler.sequence) and ruler.order() == 8
+        assert 34 <= ruler.length() < greedy[-1]
+
+    # The first squeezed ruler is already golomb, the genetic search keeps its marks
+    ruler = search(6, Heuristic.Genetic, time_budget_s=0.5, seed=0, marks=[0, 1, 4, 10, 30, 60])
+    assert is_golomb_ruler(ruler.sequence) and ruler.order() == 6 and ruler.length() < 60
+
+    ruler = optimize(7, time_budget_s=0.5, starts=2, max_workers=2, seed=0)
+    assert is_golomb_ruler(ruler.sequence) and ruler.length() == 25
+
+
+def test_solve_job_grace(monkeypatch):
+    import time
+
+    from .. import models, sweep
+    from ..telemetry import SolveResult
+
+    # A solver returning its incumbent just after its time limit isn't killed
+    def late_solve(order, *args):
+        time.sleep(0.3)
+        return SolveResult(GolombRuler([0, 1, 3]), order, "", "", "", None, status="limit")
+
+    monkeypatch.setattr(models, "solve_detailed", late_solve)
+    row = sweep._solve_job(
+        3, models.Formulations.IntegerLinearProgram, models.AMPLSolver.CPLEX, None, 0.1
+    )
+    assert row["status"] == "optimal" and row["length"] == 3
+
+
+class _FakeAMPL:
+    """Stands in for `amplpy.AMPL`, answering every solve with the ruler `marks`."""
+
+    reads = 0
+
+    def __init__(self):
+        self.param, self.option, self.evals = {}, {}, []
+        self.values = dict(
+            solve_message="CPLEX 22.1.0: optimal integer solution; objective 6\n12 branch-and-bound nodes",
+            _solve_elapsed_time=0.5,
+            _nvars=63,
+            _ncons=33,
+        )
+        self.marks = [0, 1, 4, 6]
+
+    def read(self, path):
+        _FakeAMPL.reads += 1
+
+    def eval(self, statements):
+        self.evals.append(statements)
+
+    def solve(self):
+        pass
+
+    def get_value(self, name):
+        return self.values[name]
+
+    def get_variable(self, name):
+        from types import SimpleNamespace
+
+        marks = self.marks
+        values = {(1, j + 1): float(m) for j, m in enumerate(marks) if j > 0}
+        return SimpleNamespace(
+            get_values=lambda: SimpleNamespace(to_dict=lambda: values)
+        )
+
+    def get_objective(self, name):
+        from types import SimpleNamespace
+
+        return SimpleNamespace(value=lambda: float(self.marks[-1]))
+
+    def close(self):
+        pass
+
+
+def test_ampl_session(monkeypatch):
+    import sys
+    from types import SimpleNamespace
+
+    from ..ampl import session
+
+    monkeypatch.setitem(sys.modules, "amplpy", SimpleNamespace(AMPL=_FakeAMPL))
+    monkeypatch.setattr(session, "_SESSION", None)
+    _FakeAMPL.reads = 0
+
+    s = session.get_session()
+    assert session.get_session() is s
+    ampl = s._ampl
+
+    ampl.values["solve_result"] = "solved"
+    ruler = s.solve(4, 10, 3, timeout_s=5)
+    assert ruler.sequence == [0, 1, 4, 6]
+    assert s.last_solve_result == "solved"
+    assert s.last_stats["nodes"] == 12 and s.last_stats["variables"] == 63
+    assert "timelimit=5" in ampl.option["cplex_options"]
+
+    # The next solve updates every bound of the loaded model instead of reading it again
+    ampl.values["solve_result"] = "infeasible"
+    assert s.solve(4, 5).sequence == [0]
+    assert s.last_solve_result == "infeasible"
+    assert ampl.param == dict(order=4, upper_bound=5, lower_bound=1)
+    assert "timelimit" not in ampl.option["cplex_options"]
+    assert _FakeAMPL.reads == 1
+
+    # A warm start clears the values left by the previous solve before setting its own
+    ampl.values["solve_result"] = "solved"
+    s.solve(4, 10, warm_start=[0, 1, 4, 6])
+    assert ampl.evals[-2] == session._RESET_E
+    assert "let e[1, 4, 6] := 1;" in ampl.evals[-1]
+    assert "uppercutoff=5" in ampl.option["cplex_options"].split()
+
+
+def test_constraint_program_solver():
+    from ..exceptions import FormulationNotImplemented
+    from ..models import Formulations, _solver_env, solve_detailed
+    from ..solvers import AMPLSolver
+
+    cp = Formulations.ConstraintProgram
+    assert cp.default_solver() == AMPLSolver.GECODE
+    assert Formulations.IntegerLinearProgram.supports(AMPLSolver.CPLEX)
+
+    # CPLEX can't handle `alldiff`, the combination is rejected before AMPL is run
+    with pytest.raises(FormulationNotImplemented):
+        solve_detailed(5, formulation=cp, solver=AMPLSolver.CPLEX, use_cache=False)
+
+    # Gecode has neither a best bound nor an objective cutoff option
+    env = _solver_env(AMPLSolver.GECODE, 10, 30)
+    assert env["gecode_options"].split()[-1] == "timelimit=10"
+
+
+@pytest.mark.skipif(which("ampl") is None, reason="AMPL is not installed")
+def test_constraint_program_solve():
+    from ..models import Formulations, solve_detailed
+    from ..solvers import AMPLSolver
+
+    result = solve_detailed(
+        5,
+        formulation=Formulations.ConstraintProgram,
+        solver=AMPLSolver.GECODE,
+        use_cache=False,
+        warm_start=False,
+    )
+    assert result.status == "solved"
+    assert result.ruler.length() == 11
+
+
+def test_ls_checkpoint(tmp_path):
+    import os
+    import subprocess
+    import sys
+
+    from ..checkpoint import read_checkpoint, write_checkpoint
+
+    main = join(os.path.dirname(__file__), "..", "..", "ogr_main.py")
+    env = dict(os.environ, XDG_DATA_HOME=str(tmp_path))
+    checkpoint = join(tmp_path, "ogr", "checkpoints", "ls.json")
+
+    def ls(*args):
+        output = subprocess.run(
+            [sys.executable, main, "ls", *args], env=env, capture_output=True, text=True, check=True
+        ).stdout
+        return [line.split("]")[0] for line in output.splitlines()[2:]]
+
+    # Only runs with --resume are checkpointed
+    assert ls("3") == ["[    0", "[    1", "[    2"]
+    assert not os.path.exists(checkpoint)
+    assert ls("3", "--resume") == ["[    0", "[    1", "[    2"]
+    assert ls("2", "--resume") == ["[    3", "[    4"]
+    assert read_checkpoint(checkpoint) == dict(next=5)
+
+    # Writes go through their own temporary file, none is left behind
+    write_checkpoint(checkpoint, dict(next=7))
+    assert os.listdir(os.path.dirname(checkpoint)) == ["ls.json"]
+    assert read_checkpoint(checkpoint) == dict(next=7)
@@ -1,5 +1,19 @@
 """Helper functions."""
 
+from os import makedirs
+
+from .differences import DifferenceSet
+from .exceptions import NotGolombRuler
+
+
+def data_dir() -> str:
+    """Return the directory where ogr keeps its files, creating it if needed."""
+    from appdirs import user_data_dir
+
+    path = user_data_dir("ogr", "ejovo")
+    makedirs(path, exist_ok=True)
+    return path
+
 
 def half(a: int) -> int:
     return a // 2
@@ -23,16 +37,10 @@ def is_golomb_ruler(sequence: list[int]) -> bool:
         if el < 0:
             return False
 
-    differences = set()
-
-    for lhs_index, lhs in enumerate(sequence):
-        for rhs in sequence[(lhs_index + 1) :]:
-            difference = dist(lhs, rhs)
-            # Check if the difference is distinct!
-            if difference in differences:
-                return False
-            else:
-                differences.add(difference)
+    try:
+        DifferenceSet(sequence)
+    except NotGolombRuler:
+        return False
 
     return True
 
@@ -40,9 +48,11 @@ def is_golomb_ruler(sequence: list[int]) -> bool:
 def compute_distances(sequence: list[int]) -> set[int]:
     """Compute the pairwise distances of `sequence` and return the results in a set."""
     distances = set()
+    n = len(sequence)
 
-    for lhs_index, lhs in enumerate(sequence):
-        for rhs in sequence[(lhs_index + 1) :]:
-            distances.add(dist(lhs, rhs))
+    for lhs_index in range(n):
+        lhs = sequence[lhs_index]
+        for rhs_index in range(lhs_index + 1, n):
+            distances.add(dist(lhs, sequence[rhs_index]))
 
     return distances
@@ -2,9 +2,23 @@
 
 
 import argparse
+import os
 import random
+import signal
+from contextlib import contextmanager
+
+from ogr.checkpoint import (
+    checkpoint_path,
+    read_checkpoint,
+    remove_checkpoint,
+    write_checkpoint,
+)
+from ogr.enumerate import iter_rulers
+from ogr.sampling import random_golomb_ruler, sample_golomb_rulers
+
+# The modules needing NumPy, polars or AMPL are imported by the subcommands that use them, so that
+# short calls don't pay for them
 
-import ogr_rust
 
 def main():
     parser = argparse.ArgumentParser(prog="OGR")
@@ -19,6 +33,22 @@ def main():
     parser_enum.add_argument(
         "-g", "--golomb", action="store_true", help="Keep only golomb rulers"
     )
+    parser_enum.add_argument(
+        "-q", "--quiet", action="store_true", help="Only print the number of rulers"
+    )
+    parser_enum.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted enumeration from its checkpoint",
+    )
+    parser_enum.add_argument(
+        "--store",
+        nargs="?",
+        const=True,
+        default=None,
+        metavar="DIR",
+        help="Also write the rulers to the Parquet store, in the user data dir by default",
+    )
     # parser_enum.add_argument(
     #     "-x",
     #     "--exact",
@@ -31,6 +61,30 @@ def main():
         "order", type=int, help="The order of the ruler to search for"
     )
     parser_search.add_argument("--subcommand", default="search", help=argparse.SUPPRESS)
+    parser_search.add_argument(
+        "-d",
+        "--depth",
+        type=int,
+        default=None,
+        help="Number of marks fixed by each work unit. Defaults to ogr.distributed.DEFAULT_PREFIX_DEPTH",
+    )
+    parser_search.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes. Defaults to the number of processors",
+    )
+    parser_search.add_argument(
+        "--checkpoint",
+        default=None,
+        help="File storing the progress of the search. Defaults to the user data dir",
+    )
+    parser_search.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume the search from its checkpoint",
+    )
 
     parser_rand = subparsers.add_parser("rand", help="Generate random rulers")
     parser_rand.add_argument("length", type=int, help="The length of the ruler")
@@ -41,13 +95,35 @@ def main():
         default=1,
         help="The number of rulers to return. Default 1",
     )
+    parser_rand.add_argument(
+        "-g",
+        "--golomb",
+        action="store_true",
+        help="Only generate golomb rulers, built mark by mark",
+    )
+    parser_rand.add_argument(
+        "-o", "--order", type=int, default=None, help="Restrict the order of golomb rulers"
+    )
+    parser_rand.add_argument(
+        "-u",
+        "--uniform",
+        action="store_true",
+        help="Draw golomb rulers uniformly, after counting them",
+    )
+    parser_rand.add_argument("--seed", type=int, default=None)
     parser_rand.add_argument("--subcommand", default="rand", help=argparse.SUPPRESS)
 
-    # Draw random rulers until we get one with the golomb property!
+    # Draw a ruler with the golomb property, built mark by mark
     parser_draw = subparsers.add_parser(
-        "draw", help="Randomly draw rulers until we get one with the golomb property"
+        "draw", help="Randomly draw a ruler with the golomb property"
     )
     parser_draw.add_argument("length", type=int)
+    parser_draw.add_argument(
+        "-u",
+        "--uniform",
+        action="store_true",
+        help="Draw uniformly, after counting the rulers. Only for short lengths",
+    )
     parser_draw.add_argument("--subcommand", default="draw", help=argparse.SUPPRESS)
 
     parser_list = subparsers.add_parser("ls", help="Print the first n rulers")
@@ -55,6 +131,110 @@ def main():
     parser_list.add_argument("--subcommand", default="ls", help=argparse.SUPPRESS)
     parser_list.add_argument("--from", type=int, dest="start", default=0)
     parser_list.add_argument("--state", action="store_true")
+    parser_list.add_argument(
+        "--resume",
+        action="store_true",
+        help="Start after the last id printed by the previous run with --resume, and checkpoint this one",
+    )
+    parser_list.add_argument(
+        "--store",
+        nargs="?",
+        const=True,
+        default=None,
+        metavar="DIR",
+        help="Also write the rulers to the Parquet store, in the user data dir by default",
+    )
+
+    parser_query = subparsers.add_parser("query", help="Read rulers from the Parquet store")
+    parser_query.add_argument("--subcommand", default="query", help=argparse.SUPPRESS)
+    parser_query.add_argument("-o", "--order", type=int, default=None)
+    parser_query.add_argument("--min-length", type=int, default=None)
+    parser_query.add_argument("--max-length", type=int, default=None)
+    parser_query.add_argument(
+        "-g", "--golomb", action="store_true", help="Keep only golomb rulers"
+    )
+    parser_query.add_argument(
+        "--source", default=None, help="Keep only the rulers written by this subcommand"
+    )
+    parser_query.add_argument(
+        "--store", default=None, metavar="DIR", help="Defaults to the user data dir"
+    )
+    parser_query.add_argument(
+        "-q", "--quiet", action="store_true", help="Only print the number of rulers"
+    )
+
+    parser_construct = subparsers.add_parser(
+        "construct", help="Build a short ruler with an algebraic construction"
+    )
+    parser_construct.add_argument("order", type=int, help="The order of the ruler")
+    parser_construct.add_argument(
+        "--subcommand", default="construct", help=argparse.SUPPRESS
+    )
+
+    parser_improve = subparsers.add_parser(
+        "improve", help="Shorten a ruler with local search, without proving optimality"
+    )
+    parser_improve.add_argument("order", type=int, help="The order of the ruler")
+    parser_improve.add_argument("--subcommand", default="improve", help=argparse.SUPPRESS)
+    parser_improve.add_argument(
+        "--heuristic",
+        default="sa",
+        help="Must be in ['sa', 'tabu', 'ga']. Default sa",
+    )
+    parser_improve.add_argument(
+        "-t",
+        "--time",
+        type=float,
+        default=60,
+        help="Time budget of each search in seconds. Default 60",
+    )
+    parser_improve.add_argument(
+        "-s",
+        "--starts",
+        type=int,
+        default=None,
+        help="Number of independent searches. Defaults to the number of processors",
+    )
+    parser_improve.add_argument(
+        "-w", "--workers", type=int, default=None, help="Number of worker processes"
+    )
+    parser_improve.add_argument("--seed", type=int, default=None)
+
+    parser_bench = subparsers.add_parser(
+        "bench", help="Time the generators, validators and solvers"
+    )
+    parser_bench.add_argument("--subcommand", default="bench", help=argparse.SUPPRESS)
+    parser_bench.add_argument(
+        "--orders",
+        type=int,
+        nargs=2,
+        default=[2, 10],
+        metavar=("MIN", "MAX"),
+        help="The range of orders to time. Default 2 10",
+    )
+    parser_bench.add_argument(
+        "--only", nargs="+", default=None, help="Only run these benchmarks"
+    )
+    parser_bench.add_argument(
+        "-r", "--repeat", type=int, default=5, help="Number of timed runs. Default 5"
+    )
+    parser_bench.add_argument(
+        "--history", default=None, help="Parquet file the results are appended to"
+    )
+    parser_bench.add_argument(
+        "--baseline", default=None, help="Parquet file of the baseline to compare to"
+    )
+    parser_bench.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as the new baseline",
+    )
+    parser_bench.add_argument(
+        "--tolerance",
+        type=float,
+        default=None,
+        help="Slowdown over the baseline that counts as a regression. Defaults to ogr.bench.DEFAULT_TOLERANCE",
+    )
 
     args = parser.parse_args()
 
@@ -65,89 +245,234 @@ def main():
         parser.print_help()
         exit(1)
 
+    # Preemption sends SIGTERM, stop like on Ctrl-C so that the checkpoints are written
+    signal.signal(signal.SIGTERM, _interrupt)
+
     if args.subcommand == "enum":
         print("Executing enum!")
 
-        if args.order is not None:
-            rulers = ogr_rust.enumerate_pruned_rulers(args.order, args.length)
-        else:
-            rulers = ogr_rust.enumerate_rulers_with_length(args.length)
-
-        if args.golomb:
-            rulers = [r for r in rulers if r.is_golomb_ruler()]
-
-        for r in rulers:
-            print(r)
-
+        # Rulers are generated lazily and golomb pruning happens during the generation
+        checkpoint = checkpoint_path(f"enum_{args.length}_{args.order}_{args.golomb}")
+        state = read_checkpoint(checkpoint) if args.resume else None
+        if state is None:
+            state = dict(after=None, count=0)
+
+        writer = None
+        if args.store is not None:
+            from ogr.store import RulerWriter
+
+            writer = RulerWriter(_store_path(args.store), source="enum")
+
+        try:
+            for batch in iter_rulers(
+                args.length, args.order, golomb_only=args.golomb, after=state["after"]
+            ):
+                if not args.quiet:
+                    print("\n".join(str(r) for r in batch))
+                state["after"] = batch[-1]
+                state["count"] += len(batch)
+                # Together, so that an interrupt neither skips nor stores twice a batch on resume
+                with _uninterrupted():
+                    write_checkpoint(checkpoint, state)
+                    if writer is not None:
+                        writer.write(batch, golomb=True if args.golomb else None)
+        except KeyboardInterrupt:
+            print("Interrupted, continue the enumeration with --resume")
+            exit(1)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        remove_checkpoint(checkpoint)
+        count = state["count"]
         if args.golomb and args.order:
             print(
-                f"{len(rulers)} golomb rulers with order {args.order} and max length {args.length}"
+                f"{count} golomb rulers with order {args.order} and max length {args.length}"
             )
         else:
-            print(f"{len(rulers)} rulers")
+            print(f"{count} rulers")
 
     elif args.subcommand == "search":
-        print("Searching!!")
-
-        # We want to iterate non stop until we've found a ruler
-        for i in range(10):
-            print(i, ogr_rust.Ruler.from_id(i))
+        from ogr.distributed import DEFAULT_PREFIX_DEPTH, search_parallel
+
+        try:
+            ruler = search_parallel(
+                args.order,
+                args.depth or DEFAULT_PREFIX_DEPTH,
+                args.workers,
+                args.checkpoint,
+                args.resume,
+                verbose=True,
+            )
+        except KeyboardInterrupt:
+            print("Interrupted, continue the search with --resume")
+            exit(1)
+        print(ruler)
 
     elif args.subcommand == "rand":
         print("Rand!")
-        for _ in range(args.trials):
-            print(get_random_ruler_length(args.length))
-
-    elif args.subcommand == "draw":
-        count = 0
-        draw = get_random_ruler_length(args.length)
+        rng = random.Random(args.seed)
+        if args.golomb:
+            try:
+                rulers = sample_golomb_rulers(
+                    args.length, args.trials, args.order, args.uniform, rng
+                )
+            except ValueError as e:
+                print(e)
+                exit(1)
+            print("\n".join(str(marks) for marks in rulers))
+        else:
+            from ogr.codec import from_id, id_range
 
-        while not draw.is_golomb_ruler():
-            count += 1
-            draw = get_random_ruler_length(args.length)
+            lo, hi = id_range(args.length)
+            print(
+                "\n".join(str(from_id(rng.randint(lo, hi))) for _ in range(args.trials))
+            )
 
-        print(count, draw)
+    elif args.subcommand == "draw":
+        try:
+            print(random_golomb_ruler(args.length, uniform=args.uniform))
+        except ValueError as e:
+            print(e)
+            exit(1)
+
+    elif args.subcommand == "construct":
+        from ogr.constructions import best_construction
+
+        marks, name = best_construction(args.order)
+        print(f"{name}: length {marks[-1]}")
+        print(marks)
+
+    elif args.subcommand == "improve":
+        from ogr.heuristics import Heuristic, optimize
+
+        ruler = optimize(
+            args.order,
+            Heuristic.from_str(args.heuristic),
+            args.time,
+            args.starts,
+            args.workers,
+            args.seed,
+            verbose=True,
+        )
+        print(ruler)
+
+    elif args.subcommand == "bench":
+        import polars
+
+        from ogr import bench
+
+        tolerance = bench.DEFAULT_TOLERANCE if args.tolerance is None else args.tolerance
+        results = bench.run_benchmarks(
+            range(args.orders[0], args.orders[1] + 1),
+            args.only,
+            args.repeat,
+            verbose=True,
+        )
+        bench.append_history(results, args.history)
+
+        baseline = args.baseline or bench.baseline_path()
+        if args.save_baseline:
+            bench.save_baseline(results, baseline)
+        elif os.path.exists(baseline):
+            compared = bench.compare(
+                results,
+                polars.read_parquet(baseline),
+                tolerance,
+            )
+            regressions = compared.filter(polars.col("regression"))
+            if len(regressions) > 0:
+                print("Regressions against the baseline:")
+                print(regressions.select("benchmark", "order", "best_s", "baseline_s", "ratio"))
+                exit(1)
+            print("No regression against the baseline")
 
     elif args.subcommand == "ls":
+        checkpoint = checkpoint_path("ls")
+        state = read_checkpoint(checkpoint) if args.resume else None
+        start = state["next"] if state is not None else args.start
+
         print("  Id")
         print("-------")
-        for i in range(args.start, args.start + args.n):
-            if args.state:
-                r = ogr_rust.Ruler.from_id(i)
-                print(f"[{i:5}] {str(r)[:20]}\t{r.to_state()}")
+        from ogr import codec
+
+        listed = []
+        try:
+            # Ids are converted to marks a chunk at a time
+            for i in range(start, start + args.n, _LS_CHUNK):
+                stop = min(i + _LS_CHUNK, start + args.n)
+                rulers = codec.rows(codec.marks_from_id_range(i, stop))
+                lines = []
+                for id, marks in enumerate(rulers, i):
+                    if args.state:
+                        inner = set(marks)
+                        state = [m in inner for m in range(1, marks[-1])]
+                        lines.append(f"[{id:5}] {str(marks)[:20]}\t{state}")
+                    else:
+                        lines.append(f"[{id:5}] {marks}")
+                # Together, so that an interrupt neither skips nor prints twice a chunk on resume
+                with _uninterrupted():
+                    print("\n".join(lines))
+                    if args.resume:
+                        write_checkpoint(checkpoint, dict(next=stop))
+                if args.store is not None:
+                    listed.extend(rulers)
+        except KeyboardInterrupt:
+            if args.resume:
+                print("Interrupted, continue with --resume")
             else:
-                print(f"[{i:5}] {ogr_rust.Ruler.from_id(i)}")
+                print("Interrupted")
+        finally:
+            if listed:
+                from ogr.store import write_rulers
 
+                write_rulers([listed], _store_path(args.store), source="ls")
 
-# ---------------------------------------------------------------------------- #
-#                                 Library code                                 #
-# ---------------------------------------------------------------------------- #
-# Functions to get some random rulers
-# What's the number to length calculation?
+    elif args.subcommand == "query":
+        from ogr.store import read_rulers
 
-"""Return the id range of rulers with length `length`."""
+        table = read_rulers(
+            args.store,
+            args.order,
+            args.min_length,
+            args.max_length,
+            True if args.golomb else None,
+            args.source,
+            columns=["marks"],
+        )
+        if not args.quiet:
+            for marks in table.column("marks").to_pylist():
+                print(marks)
+        print(f"{table.num_rows} rulers")
 
 
-def range_ruler_length(length: int) -> tuple[int, int]:
-    if length == 0:
-        return (0, 0)
-    elif length == 1:
-        return (1, 1)
-    else:
-        return (2 ** (length - 1), (2**length) - 1)
+# Number of ids converted at once by `ls`
+_LS_CHUNK = 4096
 
 
-def get_random_ruler_length(length: int):
-    range = range_ruler_length(length)
-    return ogr_rust.Ruler.from_id(random.randint(range[0], range[1]))
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
 
 
-def erdos_turan(odd_prime: int) -> list[int]:
-    return [2 * odd_prime * k + ((k * k) % odd_prime) for k in range(0, odd_prime)]
+@contextmanager
+def _uninterrupted():
+    """Hold Ctrl-C and SIGTERM until the end of the block, where they are raised."""
+    if not hasattr(signal, "pthread_sigmask"):
+        yield
+        return
+
+    signals = {signal.SIGINT, signal.SIGTERM}
+    signal.pthread_sigmask(signal.SIG_BLOCK, signals)
+    try:
+        yield
+    finally:
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, signals)
+
+
+def _store_path(store: str | bool) -> str | None:
+    """Return the folder given to --store, None for the default one."""
+    return None if store is True else store
 
 
 if __name__ == "__main__":
     main()
-
-    et = erdos_turan(37)
-    print(et)
@@ -1,19 +1,19 @@
-import polars
-
 import ogr
 
 
 def solve():
     """Test solving suite for Optimal Golomb Rulers."""
+    from ogr.sweep import solve_range
 
     max_order = 7
 
-    for order in range(2, max_order):
-        ruler = ogr.solve(order, verbose=True)
-        print(ruler)
+    df = solve_range(range(2, max_order), verbose=True)
+    print(df)
 
 
 def generate_rulers():
+    import polars
+
     # Start off using a naive method
     max_order = 20
 
@@ -25,8 +25,8 @@ def generate_rulers():
     naive_lengths = [ruler.length() for ruler in naive_rulers]
 
     improved_rulers = [
-        ogr.GolombRuler(ogr.generate_golomb_ruler_improved(order))
-        for order in range(1, max_order + 1)
+        ogr.GolombRuler(marks)
+        for marks in ogr.generate_golomb_rulers_improved(max_order)
     ]
     improved_orders = [ruler.order() for ruler in improved_rulers]
     improved_lengths = [ruler.length() for ruler in improved_rulers]